@@ -15,7 +15,7 @@
 -- This is a simple CDC block, transmitting the Wishbone accesses from
 -- the "SLAVE" clock domain to the "MASTER" clock domain.
 -- Please note, that the block requires timing constraints, limiting
--- 1) the bus skew between the address, data and WE lines for transmission
+-- 1) the bus skew between the address, data, SEL and WE lines for transmission
 --    from SLAVE to MASTER side.
 -- 2) the bus skew between the data, ACK, ERR, and RTY lines for
 --    transmission from MASTER to SLAVE.
@@ -243,9 +243,10 @@ begin  -- architecture rtl
         end if;
         if active = '1' then
           if cancel = '0' then
-            -- Copy address, data and WE
+            -- Copy address, data, byte selects and WE
             master_o.adr <= slave_i.adr;
             master_o.dat <= slave_i.dat;
+            master_o.sel <= slave_i.sel;
             master_o.we  <= slave_i.we;
             -- Start the access
             master_o.cyc <= '1';
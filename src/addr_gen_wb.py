@@ -33,7 +33,24 @@ PARSER = argparse.ArgumentParser()
 PARSER.add_argument("--infile", help="Input file path", default="../example1.xml")
 PARSER.add_argument("--hdl", help="VHDL outputs destination", default="")
 PARSER.add_argument("--ipbus", help="IPbus outputs destination", default="")
+PARSER.add_argument(
+    "--ipbus_elems",
+    help="Maximum length of register vectors described in IPbus tables with per-element nodes (-1 - no limit)",
+    type=int,
+    default=-1,
+)
+PARSER.add_argument(
+    "--ipbus_area",
+    help="Add IPbus nodes covering the whole registers areas of blocks",
+    action="store_true",
+)
 PARSER.add_argument("--header", help="C header outputs destination", default="")
+PARSER.add_argument(
+    "--c_paths",
+    help="Generate C tables for lookup of registers by paths",
+    action="store_true",
+)
+PARSER.add_argument("--cpp", help="C++ header outputs destination", default="")
 PARSER.add_argument("--fs", help="Forth outputs destination", default="")
 PARSER.add_argument("--python", help="Python outputs destination", default="")
 PARSER.add_argument("--html", help="HTML documentation destination", default="")
@@ -46,6 +63,8 @@ ARGS = PARSER.parse_args()
 INFILENAME = ARGS.infile
 
 wb.GLB.IPBUS_PATH = ARGS.ipbus
+wb.GLB.IPBUS_ELEMS = ARGS.ipbus_elems
+wb.GLB.IPBUS_AREA = ARGS.ipbus_area
 if wb.GLB.IPBUS_PATH:
     os.makedirs(wb.GLB.IPBUS_PATH, exist_ok=True)
 
@@ -53,11 +72,16 @@ wb.GLB.VHDL_PATH = ARGS.hdl
 if wb.GLB.VHDL_PATH:
     os.makedirs(wb.GLB.VHDL_PATH, exist_ok=True)
 
+wb.GLB.CPP_PATH = ARGS.cpp
+if wb.GLB.CPP_PATH:
+    os.makedirs(wb.GLB.CPP_PATH, exist_ok=True)
+
 wb.GLB.FORTH_PATH = ARGS.fs
 if wb.GLB.FORTH_PATH:
     os.makedirs(wb.GLB.FORTH_PATH, exist_ok=True)
 
 wb.GLB.C_HEADER_PATH = ARGS.header
+wb.GLB.C_PATHS = ARGS.c_paths
 if wb.GLB.C_HEADER_PATH:
     os.makedirs(wb.GLB.C_HEADER_PATH, exist_ok=True)
 
@@ -107,6 +131,13 @@ if "masters" in EL_ROOT.attrib:
     N_MASTERS = ex.exprval(EL_ROOT.attrib["masters"])
 else:
     N_MASTERS = 1
+# Width of the data bus (the default is 32 bits)
+wb.GLB.DATA_WIDTH = ex.exprval(EL_ROOT.get("data_width", "32"))
+if wb.GLB.DATA_WIDTH not in (32, 64):
+    raise Exception("Unsupported data width: " + str(wb.GLB.DATA_WIDTH))
+# The IPbus (and uHAL) supports only 32-bit words
+if wb.GLB.IPBUS_PATH and wb.GLB.DATA_WIDTH != 32:
+    raise Exception("IPbus address tables may be generated only for the 32-bit data bus")
 # Find constants and feed them into the expressions module
 for el in EL_ROOT.findall("constant"):
     ex.addval(el.attrib["name"], el.attrib["val"])
@@ -155,8 +186,16 @@ if wb.GLB.PYTHON_PATH:
     dst_path = wb.GLB.PYTHON_PATH + "/agwb"
     os.makedirs(dst_path, exist_ok=True)
     src_path = os.path.join(os.path.dirname(__file__), "../targets/python/agwb/")
-    shutil.copy(src_path + "__init__.py", dst_path)
-    shutil.copy(src_path + "agwb.py", dst_path)
+    for fname in (
+        "__init__.py",
+        "agwb.py",
+        "aio.py",
+        "threadsafe.py",
+        "mmap_iface.py",
+        "emul.py",
+        "ipbus.py",
+    ):
+        shutil.copy(src_path + fname, dst_path)
     with open(wb.GLB.PYTHON_PATH + "/agwb/" + TOP_NAME + "_const.py", "w") as fo:
         for cnst in ex.defines:
             fo.write(
@@ -213,6 +252,28 @@ Do not modify it by hand.
             res += BL.gen_python()
     with open(wb.GLB.PYTHON_PATH + "/agwb/" + TOP_NAME + ".py", "w") as fo:
         fo.write(res)
+    # Generate the description used by the emulator of the register file
+    res = """\"\"\"
+This file has been automatically generated
+by the agwb (https://github.com/wzab/addr_gen_wb).
+Do not modify it by hand.
+\"\"\"\n
+"""
+    res += "from . import emul\n\n"
+    # The blocks must be defined before they are used
+    EMUL_DONE = set()
+
+    def gen_emul(bl):
+        res = ""
+        for a_r in bl.areas:
+            if isinstance(a_r.obj, wb.WbBlock) and a_r.obj.name not in EMUL_DONE:
+                res += gen_emul(a_r.obj)
+        EMUL_DONE.add(bl.name)
+        return res + bl.gen_python_emul()
+
+    res += gen_emul(wb.blocks()[TOP_NAME])
+    with open(wb.GLB.PYTHON_PATH + "/agwb/" + TOP_NAME + "_emul.py", "w") as fo:
+        fo.write(res)
     with open(wb.GLB.PYTHON_PATH + "/agwb/" + "__init__.py", "a") as f:
         f.write(
                 "from ." + TOP_NAME + " import *\n"
@@ -229,6 +290,22 @@ if wb.GLB.C_HEADER_PATH:
     for key, BL in wb.blocks().items():
         if BL.used:
             BL.gen_c_header()
+    if wb.GLB.C_PATHS:
+        shutil.copy(
+            os.path.join(os.path.dirname(__file__), "../targets/c/agwb_paths.h"),
+            wb.GLB.C_HEADER_PATH,
+        )
+        for key, BL in wb.blocks().items():
+            if BL.used:
+                BL.gen_c_paths()
+# Now we generate the C++ address tables
+if wb.GLB.CPP_PATH:
+    shutil.copy(
+        os.path.join(os.path.dirname(__file__), "../targets/cpp/agwb.hpp"), wb.GLB.CPP_PATH
+    )
+    for key, BL in wb.blocks().items():
+        if BL.used:
+            BL.gen_cpp_header()
 # Generate the Forth address table
 BL = wb.blocks()[TOP_NAME]
 if wb.GLB.FORTH_PATH:
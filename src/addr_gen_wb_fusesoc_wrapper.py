@@ -37,11 +37,31 @@ if __name__ == "__main__":
         args += ['--ipbus', files_root + ipbus]
     except:
         pass
+    try:
+        ipbus_elems = str(config['parameters']['ipbus_elems'])
+        args += ['--ipbus_elems', ipbus_elems]
+    except:
+        pass
+    try:
+        if config['parameters']['ipbus_area']:
+            args += ['--ipbus_area']
+    except:
+        pass
     try:
         header = str(config['parameters']['header'])
         args += ['--header', files_root + header]
     except:
         pass
+    try:
+        if config['parameters']['c_paths']:
+            args += ['--c_paths']
+    except:
+        pass
+    try:
+        cpp = str(config['parameters']['cpp'])
+        args += ['--cpp', files_root + cpp]
+    except:
+        pass
     try:
         fs = str(config['parameters']['fs'])
         args += ['--fs', files_root + fs]
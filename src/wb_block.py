@@ -100,6 +100,36 @@ def templ_wb(nof_masters):
     constant c_address : t_wishbone_address_array(0 to {nof_subblks}-1) := {p_addresses};
     constant c_mask : t_wishbone_address_array(0 to {nof_subblks}-1) := {p_masks};
 
+    -- Merging of the written data with the old value, according to the byte selects
+    function sel_merge(old_val, new_val, sel : std_logic_vector) return std_logic_vector is
+      alias o : std_logic_vector(old_val'length-1 downto 0) is old_val;
+      alias n : std_logic_vector(new_val'length-1 downto 0) is new_val;
+      alias s : std_logic_vector(sel'length-1 downto 0) is sel;
+      variable res : std_logic_vector(old_val'length-1 downto 0);
+    begin
+      res := o;
+      for i in res'range loop
+        if s(i / 8) = '1' then
+          res(i) := n(i);
+        end if;
+      end loop;
+      return res;
+    end function;
+
+    -- Clearing of the written data in the bytes not selected by the byte selects
+    function sel_bits(val, sel : std_logic_vector) return std_logic_vector is
+      alias v : std_logic_vector(val'length-1 downto 0) is val;
+      alias s : std_logic_vector(sel'length-1 downto 0) is sel;
+      variable res : std_logic_vector(val'length-1 downto 0) := (others => '0');
+    begin
+      for i in res'range loop
+        if s(i / 8) = '1' then
+          res(i) := v(i);
+        end if;
+      end loop;
+      return res;
+    end function;
+
   begin
 """
     if nof_masters == 1:
@@ -169,7 +199,7 @@ def templ_wb(nof_masters):
                int_regs_wb_m_i.ack <= '1';
                int_regs_wb_m_i.err <= '0';
             when others =>
-               int_regs_wb_m_i.dat <= x"A5A5A5A5";
+               int_regs_wb_m_i.dat <= {dat_unmapped};
                int_regs_wb_m_i.ack <= '0';
                int_regs_wb_m_i.err <= '1';
             end case;
@@ -188,6 +218,15 @@ class GlobalVars(object):
         self.blocks = {}
         self.blackboxes = {}
         self.VER_ID = 0
+        # Width of the data bus (32 or 64 bits)
+        self.DATA_WIDTH = 32
+        # Maximum length of the register vector described in the IPbus tables
+        # with per-element nodes (negative value - no limit)
+        self.IPBUS_ELEMS = -1
+        # Add the IPbus node covering the whole registers area
+        self.IPBUS_AREA = False
+        # Generate the C tables for lookup of registers by paths
+        self.C_PATHS = False
 
 
 GLB = GlobalVars()
@@ -197,10 +236,72 @@ def blocks():
     return GLB.blocks
 
 
+def c_word():
+    """ Returns the C type of the data word """
+    return "uint" + str(GLB.DATA_WIDTH) + "_t"
+
+
 def blackboxes():
     return GLB.blackboxes
 
 
+def path_hash(key, seed):
+    """ FNV-1a hash with seed (the same as agwb_path_hash in agwb_paths.h) """
+    hval = 2166136261 ^ seed
+    for c in key.encode():
+        hval = ((hval ^ c) * 16777619) & 0xFFFFFFFF
+    return hval
+
+
+def build_chd(keys):
+    """ Builds the perfect hash table for the keys with the CHD
+    (hash, displace and compress) algorithm.
+    The key is placed in the slot
+    path_hash(key, disp[path_hash(key, 0) % len(disp)]) % len(slots).
+    Returns the list of slots (key or None) and the list of displacements.
+    """
+    n_disp = max(1, (len(keys) + 3) // 4)
+    n_slots = max(1, len(keys))
+    while True:
+        buckets = [[] for _ in range(n_disp)]
+        for key in keys:
+            buckets[path_hash(key, 0) % n_disp].append(key)
+        slots = [None] * n_slots
+        disp = [0] * n_disp
+        # Place the biggest buckets first
+        for b_n in sorted(range(n_disp), key=lambda b: -len(buckets[b])):
+            if not buckets[b_n]:
+                continue
+            for d_v in range(1, 100000):
+                pos = [path_hash(key, d_v) % n_slots for key in buckets[b_n]]
+                if len(set(pos)) == len(pos) and all(slots[p] is None for p in pos):
+                    break
+            else:
+                break
+            for key, p in zip(buckets[b_n], pos):
+                slots[p] = key
+            disp[b_n] = d_v
+        else:
+            return slots, disp
+        # Displacement not found, retry with more slots
+        n_slots += 1
+
+
+def ipbus_block_node(name, adr, size, perms):
+    """ Returns the IPbus node describing the area accessed with block transfers """
+    return (
+        '  <node id="'
+        + name
+        + '" address="0x'
+        + format(adr, "08x")
+        + '" mode="incremental" size="'
+        + str(size)
+        + '" permission="'
+        + perms
+        + '"/>\n'
+    )
+
+
 class WbObject(object):
     def is_ignored(self, mode):
         x = self.ignore.split(",")
@@ -230,7 +331,7 @@ class WbField(WbObject):
             # Now we must set the bits belonging to the bitfield.
             # Create the mask for the bitfield
             or_mask = ((1 << self.size) - 1) << self.lsb
-            and_mask = ((1 << 32) - 1) ^ or_mask
+            and_mask = ((1 << GLB.DATA_WIDTH) - 1) ^ or_mask
             # Check if the default value is not out of limits
             val = self.default_val
             if self.type == "signed":
@@ -285,35 +386,70 @@ class WbReg(WbObject):
             self.force_vec = True
 
         self.regtype = el.tag
+        # FIFO port is handled as the status register (read FIFO, with ACK)
+        # or as the control register (write FIFO, with STB)
+        self.fifo = el.tag == "fifo"
+        if self.fifo:
+            fdir = el.get("dir", "read")
+            if fdir == "read":
+                self.regtype = "sreg"
+            elif fdir == "write":
+                self.regtype = "creg"
+            else:
+                raise Exception("Incorrect direction of FIFO " + el.attrib["name"] + ": " + fdir)
         self.type = el.get("type", "std_logic_vector")
         self.stype = el.get("stype", None)
         self.base = adr
         self.name = el.attrib["name"]
-        self.mode = el.get("mode", "")
+        self.mode = el.get("mode", "port" if self.fifo else "")
         self.ignore = el.get("ignore", "")
         self.desc = el.get("desc", "")
         self.ack = ex.exprval(el.get("ack", "0"))
         self.stb = ex.exprval(el.get("stb", "0"))
+        if self.fifo:
+            # Each word transferred via the FIFO port is acknowledged or strobed
+            self.ack = int(self.regtype == "sreg")
+            self.stb = int(self.regtype == "creg")
+        # Optional SET/CLR/TOGGLE aliases for atomic bit updates
+        self.bitops = ex.exprval(el.get("bitops", "0"))
+        if self.bitops == 1 and (self.regtype != "creg" or self.fifo):
+            raise Exception("Only control register may have bitops aliases: " + self.name)
+        # Optional snapshot group: reading the first register of the group
+        # latches all registers of the group, so they are read consistently
+        self.snapshot = el.get("snapshot")
+        if self.snapshot is not None and (self.regtype != "sreg" or self.fifo):
+            raise Exception("Only status register may belong to a snapshot group: " + self.name)
+        # Number of addresses occupied by the register (including the aliases)
+        if self.bitops == 1:
+            self.addr_size = 4 * self.size
+        else:
+            self.addr_size = self.size
         # Set the width of the register
-        self.width = ex.exprval(el.get("width", "32"))
+        self.width = ex.exprval(el.get("width", str(GLB.DATA_WIDTH)))
         # Read list of fields
         self.fields = []
         self.free_bit = 0
         for f_l in el.findall("field"):
             fdef = WbField(f_l, self.free_bit)
             self.free_bit += fdef.size
-            if self.free_bit > 32:
+            if self.free_bit > GLB.DATA_WIDTH:
                 raise Exception(
                     "Total width of fields in register "
                     + self.name
-                    + " is above 32-bits"
+                    + " is above "
+                    + str(GLB.DATA_WIDTH)
+                    + "-bits"
                 )
             self.fields.append(fdef)
         # For registers with bitfields we allow enforcing the name of the generated record type
         if self.fields and self.type != "std_logic_vector":
             raise Exception("Register with fields must be of type std_logic_vector")
+        if self.width > GLB.DATA_WIDTH:
+            raise Exception(
+                "Width of register " + self.name + " is above " + str(GLB.DATA_WIDTH) + "-bits"
+            )
         if self.free_bit == 0:
-            self.free_bit = 32
+            self.free_bit = GLB.DATA_WIDTH
         # For register with fields, the real width is set by the width of all fields
         if self.fields:
             self.width = self.free_bit
@@ -339,7 +475,15 @@ class WbReg(WbObject):
                     self.default += "to_" + self.stype + "("
                 else:
                     self.default += "to_" + self.name + "("
-            if self.type == "unsigned":
+            if self.default_val > 2 ** 31 - 1:
+                # The value doesn't fit in the VHDL integer, so the bit string literal is used
+                self.default += (
+                    self.type
+                    + "'(\""
+                    + format(self.default_val, "0" + str(self.width) + "b")
+                    + "\")"
+                )
+            elif self.type == "unsigned":
                 self.default += (
                     "to_unsigned(" + str(self.default_val) + "," + str(self.width) + ")"
                 )
@@ -362,6 +506,15 @@ class WbReg(WbObject):
         else:
             self.default = None
 
+    def has_latch(self, parent):
+        """
+        The method checks if the register needs the latch of the snapshot group.
+        The single first register of the group is always read directly.
+        """
+        if self.snapshot is None:
+            return False
+        return parent.snapshots[self.snapshot][0] is not self or self.size > 1
+
     def gen_vhdl(self, parent):
         """
         The method generates the VHDL block responsible for access
@@ -544,6 +697,18 @@ class WbReg(WbObject):
                 d_t += self.name + sfx + "_ack : out std_logic;\n"
         if self.regtype != "creg" or parent.out_type is None:
             parent.add_templ("signal_ports", d_t, 6)
+        # FIFO ports get the flag showing that the data may be transferred
+        # (the input, so it is never aggregated)
+        if self.fifo:
+            if self.regtype == "sreg":
+                flag = self.name + "_i_valid"
+            else:
+                flag = self.name + "_o_ready"
+            if self.force_vec:
+                d_t = flag + " : in  std_logic_vector(" + str(self.size - 1) + " downto 0);\n"
+            else:
+                d_t = flag + " : in  std_logic;\n"
+            parent.add_templ("signal_ports", d_t, 6)
         # Generate the intermediate signals for output ports
         # (because they can't be read back)
         # Connect the signals to outputs (without output aggregation) or to
@@ -601,6 +766,13 @@ class WbReg(WbObject):
                     )
             parent.add_templ("signal_decls", d_t, 4)
             parent.add_templ("cont_assigns", dt2, 4)
+        # Create the latch for registers in the snapshot group
+        if self.has_latch(parent):
+            if self.force_vec:
+                d_t = "signal int_" + self.name + "_latch : " + tname + "_array;\n"
+            else:
+                d_t = "signal int_" + self.name + "_latch : " + tname + ";\n"
+            parent.add_templ("signal_decls", d_t, 4)
         # Reset control registers
         if self.regtype == "creg":
             if self.default is not None:
@@ -640,8 +812,29 @@ class WbReg(WbObject):
             else:
                 conv_fun = "to_slv"
                 iconv_fun = "to_" + self.name
+            if self.fifo:
+                d_t, d_i = self.gen_vhdl_fifo(d_t, ind, conv_fun, iconv_fun)
+                parent.add_templ("register_access", d_t, 12)
+                parent.add_templ("signals_idle", d_i, 10)
+                continue
             # Read access
             if self.regtype == "sreg":
+                src = self.name + "_i" + ind
+                if self.snapshot is not None:
+                    group = parent.snapshots[self.snapshot]
+                    if group[0] is self and i == 0:
+                        # Reading the first register latches the whole group
+                        d_t += "   if int_regs_wb_m_o.we = '0' then\n"
+                        d_t += "     -- Latch the snapshot group " + self.snapshot + "\n"
+                        for g_r in group:
+                            if g_r.has_latch(parent):
+                                d_t += (
+                                    "     int_" + g_r.name + "_latch <= " + g_r.name + "_i;\n"
+                                )
+                        d_t += "   end if;\n"
+                    else:
+                        # Other registers are read from the latch
+                        src = "int_" + self.name + "_latch" + ind
                 # First initialize the whole retun value with zeroes
                 d_t += "   int_regs_wb_m_i.dat <= (others => '0');\n"
                 # Now set the used bits with correct values
@@ -651,9 +844,7 @@ class WbReg(WbObject):
                     + " downto 0) <= "
                     + conv_fun
                     + "("
-                    + self.name
-                    + "_i"
-                    + ind
+                    + src
                     + ");\n"
                 )
                 if self.ack == 1:
@@ -681,6 +872,7 @@ class WbReg(WbObject):
             # Write access
             if self.regtype == "creg":
                 d_t += "   if int_regs_wb_m_o.we = '1' then\n"
+                # Only the bytes selected by sel are modified
                 d_t += (
                     "     int_"
                     + self.name
@@ -688,9 +880,15 @@ class WbReg(WbObject):
                     + ind
                     + " <= "
                     + iconv_fun
-                    + "(int_regs_wb_m_o.dat("
+                    + "(sel_merge("
+                    + conv_fun
+                    + "(int_"
+                    + self.name
+                    + "_o"
+                    + ind
+                    + "), int_regs_wb_m_o.dat("
                     + str(self.width - 1)
-                    + " downto 0));\n"
+                    + " downto 0), int_regs_wb_m_o.sel));\n"
                 )
                 if self.stb == 1:
                     d_t += "   if int_regs_wb_m_i.ack = '0' then\n"
@@ -704,34 +902,163 @@ class WbReg(WbObject):
             d_t += "   int_regs_wb_m_i.err <= '0';\n"
             parent.add_templ("register_access", d_t, 12)
             parent.add_templ("signals_idle", d_i, 10)
+        # Generate the SET/CLR/TOGGLE aliases
+        # The bits set in the written word are set, cleared or toggled in the register
+        # (only in the bytes selected by sel)
+        if self.bitops == 1:
+            aliases = (("SET", "or"), ("CLR", "and not"), ("TOGGLE", "xor"))
+            for k, (aname, op) in enumerate(aliases, 1):
+                for i in range(0, self.size):
+                    if self.force_vec:
+                        ind = "(" + str(i) + ")"
+                    else:
+                        ind = ""
+                    adr = self.base + k * self.size + i
+                    d_t = (
+                        'when "'
+                        + format(adr, "0" + str(parent.reg_adr_bits) + "b")
+                        + '" => -- '
+                        + hex(adr)
+                        + " "
+                        + aname
+                        + " alias of "
+                        + self.name
+                        + ind
+                        + "\n"
+                    )
+                    # Reading the alias returns the value of the register
+                    d_t += "   int_regs_wb_m_i.dat <= (others => '0');\n"
+                    d_t += (
+                        "   int_regs_wb_m_i.dat("
+                        + str(self.width - 1)
+                        + " downto 0) <= "
+                        + conv_fun
+                        + "(int_"
+                        + self.name
+                        + "_o"
+                        + ind
+                        + ");\n"
+                    )
+                    d_t += "   if int_regs_wb_m_o.we = '1' then\n"
+                    d_t += (
+                        "     int_"
+                        + self.name
+                        + "_o"
+                        + ind
+                        + " <= "
+                        + iconv_fun
+                        + "("
+                        + conv_fun
+                        + "(int_"
+                        + self.name
+                        + "_o"
+                        + ind
+                        + ") "
+                        + op
+                        + " sel_bits(int_regs_wb_m_o.dat("
+                        + str(self.width - 1)
+                        + " downto 0), int_regs_wb_m_o.sel));\n"
+                    )
+                    if self.stb == 1:
+                        d_t += "   if int_regs_wb_m_i.ack = '0' then\n"
+                        d_t += "      int_" + self.name + sfx + "_stb" + ind + " <= '1';\n"
+                        d_t += "   end if;\n"
+                    d_t += "   end if;\n"
+                    d_t += "   int_regs_wb_m_i.ack <= '1';\n"
+                    d_t += "   int_regs_wb_m_i.err <= '0';\n"
+                    parent.add_templ("register_access", d_t, 12)
+
+    def gen_vhdl_fifo(self, d_t, ind, conv_fun, iconv_fun):
+        """
+        The method generates the access to the FIFO port.
+        The access is extended with wait states, until the FIFO
+        is able to transfer the data (valid data for read FIFO,
+        free space for write FIFO), so the bursts of accesses
+        may be performed without checking the FIFO state.
+        Access in the wrong direction results in the bus error.
+        """
+        d_i = ""
+        if self.regtype == "sreg":
+            d_t += "   if int_regs_wb_m_o.we = '0' then\n"
+            d_t += "     if " + self.name + "_i_valid" + ind + " = '1' then\n"
+            d_t += "       int_regs_wb_m_i.dat <= (others => '0');\n"
+            d_t += (
+                "       int_regs_wb_m_i.dat("
+                + str(self.width - 1)
+                + " downto 0) <= "
+                + conv_fun
+                + "("
+                + self.name
+                + "_i"
+                + ind
+                + ");\n"
+            )
+            d_t += "       " + self.name + "_i_ack" + ind + " <= '1';\n"
+            d_i += self.name + "_i_ack" + ind + " <= '0';\n"
+        else:
+            d_t += "   if int_regs_wb_m_o.we = '1' then\n"
+            d_t += "     if " + self.name + "_o_ready" + ind + " = '1' then\n"
+            d_t += (
+                "       int_"
+                + self.name
+                + "_o"
+                + ind
+                + " <= "
+                + iconv_fun
+                + "(int_regs_wb_m_o.dat("
+                + str(self.width - 1)
+                + " downto 0));\n"
+            )
+            d_t += "       int_" + self.name + "_o_stb" + ind + " <= '1';\n"
+            d_i += "int_" + self.name + "_o_stb" + ind + " <= '0';\n"
+        d_t += "       int_regs_wb_m_i.ack <= '1';\n"
+        d_t += "       int_regs_wb_m_i.err <= '0';\n"
+        d_t += "     else\n"
+        d_t += "       -- Wait state\n"
+        d_t += "       int_regs_wb_m_i.err <= '0';\n"
+        d_t += "     end if;\n"
+        d_t += "   end if;\n"
+        return d_t, d_i
 
     def gen_ipbus_xml(self, reg_base):
         # The generated code depends on the fact it is a single register or the vector of registers
         res = ""
-        for r_n in range(0, self.size):
+        # Set permissions
+        if self.fifo and self.regtype == "creg":
+            perms = "w"
+        elif self.regtype == "creg":
+            perms = "rw"
+        elif self.regtype == "sreg":
+            perms = "r"
+        else:
+            raise Exception("Unknown type of register")
+        # The vector of registers is described by the block node, so it may be
+        # transferred with a single block transfer. Per-element nodes are added
+        # only for vectors not longer than GLB.IPBUS_ELEMS (if it is not negative).
+        # Vectors of FIFO ports are always described by per-element nodes.
+        block = self.force_vec and not self.fifo
+        elems = (not block) or (GLB.IPBUS_ELEMS < 0) or (self.size <= GLB.IPBUS_ELEMS)
+        if block:
+            res += ipbus_block_node(self.name, reg_base + self.base, self.size, perms)
+        for r_n in range(0, self.size if elems else 0):
             adr = reg_base + self.base + r_n
             # The name format depends whether its a single register or an item in a vector
             if self.force_vec:
                 rname = self.name + "[" + str(r_n) + "]"
             else:
                 rname = self.name
-            # Set permissions
-            if self.regtype == "creg":
-                perms = "rw"
-            elif self.regtype == "sreg":
-                perms = "r"
-            else:
-                raise Exception("Unknown type of register")
             # Pass the "mode" attribute to the generated IPbus XML
             s_mode = ""
             if self.mode != "":
                 s_mode = ' mode="' + self.mode + '"'
 
-            # Generate the mask for register with width below 32 bits
+            # Generate the mask for register narrower than the data bus
+            # (masks have the width of the data bus)
+            mfmt = "0" + str(GLB.DATA_WIDTH // 4) + "x"
             s_mask = ""
-            if self.width < 32:
+            if self.width < GLB.DATA_WIDTH:
                 maskval = (1 << (self.width + 1)) - 1
-                s_mask = ' mask="0x' + format(maskval, "08x") + '"'
+                s_mask = ' mask="0x' + format(maskval, mfmt) + '"'
 
             # Finally the format of the description depends on the presence of bitfields
             if not self.fields:
@@ -761,14 +1088,39 @@ class WbReg(WbObject):
                 )
                 for b_f in self.fields:
                     maskval = ((1 << (b_f.msb + 1)) - 1) ^ ((1 << b_f.lsb) - 1)
-                    mask = format(maskval, "08x")
+                    mask = format(maskval, mfmt)
                     res += '    <node id="' + b_f.name + '" mask="0x' + mask + '"/>\n'
                 res += "  </node>\n"
+        # Add the SET/CLR/TOGGLE aliases
+        if self.bitops == 1:
+            for k, aname in enumerate(("SET", "CLR", "TOGGLE"), 1):
+                if block:
+                    res += ipbus_block_node(
+                        self.name + "_" + aname,
+                        reg_base + self.base + k * self.size,
+                        self.size,
+                        "rw",
+                    )
+                for r_n in range(0, self.size if elems else 0):
+                    adr = reg_base + self.base + k * self.size + r_n
+                    if self.force_vec:
+                        rname = self.name + "_" + aname + "[" + str(r_n) + "]"
+                    else:
+                        rname = self.name + "_" + aname
+                    res += (
+                        '  <node id="'
+                        + rname
+                        + '" address="0x'
+                        + format(adr, "08x")
+                        + '" permission="rw"/>\n'
+                    )
 
         return res
 
     def gen_c_header(self, reg_base, block_name):
-        res = "  " + XVOLATILE + " uint32_t " + self.name
+        # The signed type of the data word
+        s_word = "int" + str(GLB.DATA_WIDTH) + "_t"
+        res = "  " + XVOLATILE + " " + c_word() + " " + self.name
         head = ""
         if self.fields:
             # There are bitfields, so we need to generate functions needed to access them
@@ -779,18 +1131,86 @@ class WbReg(WbObject):
                 base_name = base_type + "_" + self.name + "_" + b_f.name
                 fshift = b_f.lsb
                 fmask = (1 << (b_f.msb - b_f.lsb + 1)) - 1
-                fvalmask = 0xFFFFFFFF - (fmask << b_f.lsb)
+                fvalmask = ((1 << GLB.DATA_WIDTH) - 1) - (fmask << b_f.lsb)
                 fsignmask = 1 << (b_f.msb - b_f.lsb)
-                fsignext = ((1 << (31 - (b_f.msb - b_f.lsb))) - 1) << b_f.msb
+                fsignext = ((1 << (GLB.DATA_WIDTH - b_f.size)) - 1) << b_f.size
+                # Macros allowing to compose the register value from fields
+                # (at compile time, if the values are constant)
+                head += "#define " + base_name + "_SHIFT " + str(fshift) + "\n"
+                head += "#define " + base_name + "_MASK " + hex(fmask << fshift) + "\n"
+                head += (
+                    "#define "
+                    + base_name
+                    + "_VAL(val) (((("
+                    + c_word()
+                    + ") (val)) & "
+                    + hex(fmask)
+                    + ") << "
+                    + str(fshift)
+                    + ")\n"
+                )
+                if self.bitops == 1:
+                    # The field is written via CLR and SET aliases, without reading the register
+                    # (single-bit fields need only one write, other fields are zero
+                    # between the CLR and SET writes)
+                    aptr = "((" + XVOLATILE + " " + c_word() + " *) ptr)"
+                    set_body = (
+                        "  " + c_word() + " bits = (val & "
+                        + hex(fmask)
+                        + ") << "
+                        + hex(fshift)
+                        + ";\n"
+                    )
+                    set_body += (
+                        "  if (bits != "
+                        + hex(fmask << fshift)
+                        + ") "
+                        + aptr
+                        + "["
+                        + str(2 * self.size)
+                        + "] = bits ^ "
+                        + hex(fmask << fshift)
+                        + ";\n"
+                    )
+                    set_body += (
+                        "  if (bits) " + aptr + "[" + str(self.size) + "] = bits;\n"
+                    )
+                else:
+                    set_body = (
+                        "  * ptr = ((* ptr) & "
+                        + hex(fvalmask)
+                        + ") | ((val & "
+                        + hex(fmask)
+                        + ") << "
+                        + hex(fshift)
+                        + ");\n"
+                    )
+                if b_f.size in (8, 16, 32) and b_f.size < GLB.DATA_WIDTH and b_f.lsb % b_f.size == 0:
+                    # The field occupies whole, aligned bytes, so it may be written
+                    # with the byte or halfword store (without reading the register)
+                    btype = "uint" + str(b_f.size) + "_t"
+                    set_body = (
+                        "#if __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__\n"
+                        + "  (("
+                        + XVOLATILE
+                        + " "
+                        + btype
+                        + " *) ptr)["
+                        + str(b_f.lsb // b_f.size)
+                        + "] = val;\n"
+                        + "#else\n"
+                        + set_body
+                        + "#endif\n"
+                    )
                 if b_f.type == "signed":
                     # Function for getting the value
                     head += (
-                        "static inline int32_t "
+                        "static inline " + s_word + " "
                         + base_name
-                        + "_get(uint32_t * ptr) { \n"
+                        + "_get(" + c_word() + " * ptr) { \n"
                     )
                     head += (
-                        "  int32_t res = (((* ptr) >> "
+                        "  " + s_word + " res = (((* ptr) >> "
                         + hex(fshift)
                         + ") & "
                         + hex(fmask)
@@ -807,24 +1227,16 @@ class WbReg(WbObject):
                     head += (
                         "static inline void "
                         + base_name
-                        + "_set(uint32_t * ptr, int32_t val) { \n"
-                    )
-                    head += (
-                        "  * ptr = ((* ptr) & "
-                        + hex(fvalmask)
-                        + ") | ((val & "
-                        + hex(fmask)
-                        + ") << "
-                        + hex(fshift)
-                        + ");\n"
+                        + "_set(" + c_word() + " * ptr, " + s_word + " val) { \n"
                     )
+                    head += set_body
                     head += "};\n"
                 else:
                     # Function for getting the value
                     head += (
-                        "static inline uint32_t "
+                        "static inline " + c_word() + " "
                         + base_name
-                        + "_get(uint32_t * ptr) { \n"
+                        + "_get(" + c_word() + " * ptr) { \n"
                     )
                     head += (
                         "  return ((* ptr) >> "
@@ -837,25 +1249,171 @@ class WbReg(WbObject):
                     head += (
                         "static inline void "
                         + base_name
-                        + "_set(uint32_t * ptr, uint32_t val) { \n"
-                    )
-                    head += (
-                        "  * ptr = ((* ptr) & "
-                        + hex(fvalmask)
-                        + ") | ((val & "
-                        + hex(fmask)
-                        + ") << "
-                        + hex(fshift)
-                        + ");\n"
+                        + "_set(" + c_word() + " * ptr, " + c_word() + " val) { \n"
                     )
+                    head += set_body
                     head += "};\n"
+            if self.regtype == "creg":
+                head += self.gen_c_compose(block_name)
         # The generated code depends on the fact it is a single register or the vector of registers
         if self.force_vec:
             res += "[" + str(self.size) + "];\n"
         else:
             res += ";\n"
+        if self.bitops == 1:
+            # Add the SET/CLR/TOGGLE aliases and functions using them
+            for k, aname in enumerate(("SET", "CLR", "TOGGLE"), 1):
+                res += "  " + XVOLATILE + " " + c_word() + " " + self.name + "_" + aname
+                if self.force_vec:
+                    res += "[" + str(self.size) + "];\n"
+                else:
+                    res += ";\n"
+                head += (
+                    "static inline void agwb_"
+                    + block_name
+                    + "_"
+                    + self.name
+                    + "_"
+                    + aname.lower()
+                    + "_bits(" + c_word() + " * ptr, " + c_word() + " mask) { \n"
+                )
+                head += (
+                    "  (("
+                    + XVOLATILE
+                    + " " + c_word() + " *) ptr)["
+                    + str(k * self.size)
+                    + "] = mask;\n};\n"
+                )
         return res, head
 
+    def gen_c_compose(self, block_name):
+        """ Generates the functions writing all fields of the control register
+        with a single store (compose, write), and the function modifying
+        the selected fields (modify) with a single load and store
+        (or without load, via CLR and SET aliases, if bitops are enabled).
+        """
+        s_word = "int" + str(GLB.DATA_WIDTH) + "_t"
+        reg_name = "agwb_" + block_name + "_" + self.name
+        args = []
+        vals = []
+        for b_f in self.fields:
+            if b_f.type == "signed":
+                args.append(s_word + " " + b_f.name)
+            else:
+                args.append(c_word() + " " + b_f.name)
+            vals.append(reg_name + "_" + b_f.name + "_VAL(" + b_f.name + ")")
+        res = (
+            "static inline "
+            + c_word()
+            + " "
+            + reg_name
+            + "_compose("
+            + ", ".join(args)
+            + ") { \n"
+        )
+        res += "  return " + " | ".join(vals) + ";\n};\n"
+        res += (
+            "static inline void "
+            + reg_name
+            + "_write("
+            + c_word()
+            + " * ptr, "
+            + ", ".join(args)
+            + ") { \n"
+        )
+        vptr = "((" + XVOLATILE + " " + c_word() + " *) ptr)"
+        res += (
+            "  * "
+            + vptr
+            + " = "
+            + reg_name
+            + "_compose("
+            + ", ".join(b_f.name for b_f in self.fields)
+            + ");\n};\n"
+        )
+        if self.fifo:
+            # The write FIFO port can't be read
+            return res
+        res += (
+            "static inline void "
+            + reg_name
+            + "_modify("
+            + c_word()
+            + " * ptr, "
+            + c_word()
+            + " mask, "
+            + c_word()
+            + " val) { \n"
+        )
+        if self.bitops == 1:
+            res += "  if (mask & ~val) " + vptr + "[" + str(2 * self.size) + "] = mask & ~val;\n"
+            res += "  if (mask & val) " + vptr + "[" + str(self.size) + "] = mask & val;\n"
+        else:
+            res += "  * " + vptr + " = ((* " + vptr + ") & ~mask) | (val & mask);\n"
+        res += "};\n"
+        return res
+
+    def gen_cpp(self, reg_base):
+        """ Generates the C++ method returning the register (or the vector
+        of registers, indexed with the template parameter).
+        The register with bitfields is described by the nested class template
+        providing methods returning the fields (see agwb::Reg and agwb::Field).
+        """
+        wbytes = GLB.DATA_WIDTH // 8
+        if self.fifo and self.regtype == "creg":
+            mode = "WO"
+        elif self.regtype == "creg":
+            mode = "RW"
+        else:
+            mode = "RO"
+        aliases = str(self.size * wbytes) if self.bitops == 1 else "0"
+        head = ""
+        if self.fields:
+            rtype = self.name + "_t"
+            base = "Reg<" + c_word() + ", ADDR, " + mode + ", " + aliases + ">"
+            head += "  template <std::uintptr_t ADDR>\n"
+            head += "  struct " + rtype + " : " + base + " {\n"
+            head += "    using " + base + "::operator=;\n"
+            for b_f in self.fields:
+                ftype = (
+                    "Field<"
+                    + c_word()
+                    + ", ADDR, "
+                    + str(b_f.lsb)
+                    + ", "
+                    + str(b_f.size)
+                    + ", "
+                    + ("true" if b_f.type == "signed" else "false")
+                    + ", "
+                    + mode
+                    + ", "
+                    + aliases
+                    + ">"
+                )
+                head += "    " + ftype + " " + b_f.name + "() const { return " + ftype + "(); }\n"
+            head += "  };\n"
+        else:
+            rtype = None
+        adr = "BASE + " + hex((reg_base + self.base) * wbytes)
+        if self.force_vec:
+            adr += " + I * " + str(wbytes)
+        if rtype is None:
+            rdef = "Reg<" + c_word() + ", " + adr + ", " + mode + ", " + aliases + ">"
+        else:
+            rdef = rtype + "<" + adr + ">"
+        res = ""
+        if self.desc:
+            res += "  // " + self.desc + "\n"
+        if self.force_vec:
+            res += "  template <unsigned I>\n"
+            res += "  " + rdef + " " + self.name + "() const {\n"
+            res += '    static_assert(I < ' + str(self.size) + ', "Index out of range");\n'
+            res += "    return " + rdef + "();\n"
+            res += "  }\n"
+        else:
+            res += "  " + rdef + " " + self.name + "() const { return " + rdef + "(); }\n"
+        return head + res
+
     def gen_forth(self, reg_base, parent):
         # The generated code depends on the fact it is a single register or the vector of registers
         cdefs = ""
@@ -885,6 +1443,33 @@ class WbReg(WbObject):
                     + format(b_f.lsb, "x")
                     + " ;\n"
                 )
+                if self.bitops == 1:
+                    # The field written via CLR and SET aliases with bfa! (see bf.fs)
+                    # needs also the distance to the SET alias
+                    cdefs += (
+                        ": "
+                        + node
+                        + "."
+                        + b_f.name
+                        + ".A "
+                        + node
+                        + "."
+                        + b_f.name
+                        + " $"
+                        + format(self.size, "x")
+                        + " ;\n"
+                    )
+        if self.bitops == 1:
+            # Addresses of the SET/CLR/TOGGLE aliases
+            # (the field is set or cleared by writing its mask to the alias)
+            for k, aname in enumerate(("SET", "CLR", "TOGGLE"), 1):
+                aadr = adr + k * self.size
+                if self.force_vec:
+                    # The index of the register is taken from the stack
+                    aword = parent + " + $" + format(aadr, "x") + " + ;\n"
+                else:
+                    aword = parent + " $" + format(aadr, "x") + " + ;\n"
+                cdefs += ": " + node + "_" + aname + " " + aword
         return cdefs
 
     def gen_python(self, reg_base):
@@ -906,15 +1491,29 @@ class WbReg(WbObject):
         else:
             # Single register
             res += sp8 + "'" + self.name + "':(" + hex(reg_base + self.base) + ",("
-        if self.regtype == "sreg":
+        if self.fifo:
+            res += "agwb.FifoRegister,"
+        elif self.regtype == "sreg":
             res += "agwb.StatusRegister,"
+        elif self.regtype == "creg" and self.bitops == 1:
+            res += "agwb.BitOpsRegister,"
         elif self.regtype == "creg":
             res += "agwb.ControlRegister,"
         else:
             raise Exception("Incorrect type of register:" + self.regtype)
+        # Registers with aliases get also the distance between the register and its aliases
+        # FIFO ports get the direction
+        if self.bitops == 1:
+            alias_arg = "," + str(self.size)
+        elif self.fifo:
+            alias_arg = "," + str(self.regtype == "sreg")
+        else:
+            alias_arg = ""
         if not self.fields:
             # No bitfields
-            res += ")),\n"
+            if alias_arg:
+                res += "{}"
+            res += alias_arg + ")),\n"
         else:
             # Handle bitfields
             res += "\n" + sp8 + "{\\\n"
@@ -929,14 +1528,46 @@ class WbReg(WbObject):
                     + str(f_l.lsb)
                     + ","
                 )
-                if self.type == "signed":
+                if f_l.type == "signed":
                     res += "True"
                 else:
                     res += "False"
                 res += "),\\\n"
-            res += sp8 + "})),\n"
+            res += sp8 + "}" + alias_arg + ")),\n"
         return res
 
+    def gen_python_emul(self, reg_base):
+        """ This function generates the description of the register
+        used by the Python emulator of the register file.
+        """
+        if self.regtype == "sreg":
+            writable = "False"
+        elif self.regtype == "creg":
+            writable = "True"
+        else:
+            raise Exception("Incorrect type of register:" + self.regtype)
+        default = self.default_val
+        if default is None:
+            default = 0
+        return (
+            8 * " "
+            + "("
+            + hex(reg_base + self.base)
+            + ",'"
+            + self.name
+            + "',"
+            + str(self.size)
+            + ","
+            + str(self.force_vec)
+            + ","
+            + writable
+            + ","
+            + hex(default)
+            + ","
+            + hex((1 << self.width) - 1)
+            + "),\n"
+        )
+
     def gen_html(self, base, name):
         res = ""
         res += (
@@ -950,6 +1581,19 @@ class WbReg(WbObject):
         )
         res += "</summary>"
         res += "<p>" + self.desc + "</p>"
+        if self.bitops == 1:
+            res += (
+                "<p>SET/CLR/TOGGLE aliases at: "
+                + ", ".join(hex(base + self.base + k * self.size) for k in (1, 2, 3))
+                + "</p>"
+            )
+        if self.snapshot is not None:
+            res += "<p>Snapshot group: " + self.snapshot + "</p>"
+        if self.fifo:
+            if self.regtype == "sreg":
+                res += "<p>Read FIFO port</p>"
+            else:
+                res += "<p>Write FIFO port</p>"
         if self.fields:
             res += "<ul>"
             for f_l in self.fields:
@@ -1009,7 +1653,7 @@ class WbBlackBox(WbObject):
         res = "#ifndef __" + self.name + "__INC_H\n"
         res += "#define __" + self.name + "__INC_H\n"
         res += "typedef struct {\n"
-        res += "  " + XVOLATILE + " uint32_t filler[" + str(self.addr_size) + "];\n"
+        res += "  " + XVOLATILE + " " + c_word() + " filler[" + str(self.addr_size) + "];\n"
         res += "}  __attribute__((packed)) " + "agwb_" + self.name + ";\n"
         res += "#endif\n"
         with open(GLB.C_HEADER_PATH + "/agwb_" + self.name + ".h", "w") as f_o:
@@ -1018,13 +1662,12 @@ class WbBlackBox(WbObject):
     def gen_python(self):
         """ This function generates the class providing access
         to the blackbox from the Python code.
-        Currently the blackbox is simply handled as a vector
-        of registers reg[size].
+        The blackbox is handled as a vector of registers reg[size],
+        and provides the bulk transfers (see agwb.BlackBox).
         """
         sp4 = 4 * " "
         sp8 = 8 * " "
-        res = "\nclass " + self.name + "(agwb.Block):\n"
-        res += sp4 + "x__is_blackbox = True\n"
+        res = "\nclass " + self.name + "(agwb.BlackBox):\n"
         res += sp4 + "x__size = " + str(self.addr_size) + "\n"
         res += sp4 + "x__fields = {\n"
         res += (
@@ -1043,6 +1686,179 @@ class WbBlackBox(WbObject):
         return res
 
 
+class WbMemory(WbObject):
+    """ The class WbMemory describes the memory area,
+    implemented as the dual-port RAM inside the generated block.
+    One port is accessed via Wishbone, the other is available
+    for the user logic.
+    """
+
+    def __init__(self, el):
+        self.name = el.attrib["name"]
+        self.desc = el.get("desc", "")
+        self.ignore = el.get("ignore", "")
+        if el.get("reps") is not None:
+            raise Exception("Vectors of memories are not supported: " + self.name)
+        self.width = ex.exprval(el.get("width", str(GLB.DATA_WIDTH)))
+        if self.width > GLB.DATA_WIDTH:
+            raise Exception(
+                "Width of memory " + self.name + " is above " + str(GLB.DATA_WIDTH) + "-bits"
+            )
+        self.depth = ex.exprval(el.attrib["depth"])
+        if self.depth < 2:
+            raise Exception("Depth of memory " + self.name + " must be at least 2")
+        self.adr_bits = (self.depth - 1).bit_length()
+        self.addr_size = 1 << self.adr_bits
+
+    def gen_vhdl(self, parent, port):
+        """
+        The method generates the RAM and the processes handling its ports.
+        The RAM is stored in the shared variable, so that it may be accessed
+        from two processes (possibly in different clock domains), as in the
+        templates of the true dual-port block RAM.
+        """
+        mem = "int_" + self.name + "_mem"
+        wbo = "wb_m_o(" + str(port) + ")"
+        wbi = "wb_m_i(" + str(port) + ")"
+        wadr = wbo + ".adr(" + str(self.adr_bits - 1) + " downto 0)"
+        widx = mem + "(to_integer(unsigned(" + wadr + ")))"
+        d_t = "-- Memory " + self.name + "\n"
+        d_t += (
+            "type t_"
+            + self.name
+            + "_mem is array(0 to "
+            + str(self.depth - 1)
+            + ") of std_logic_vector("
+            + str(self.width - 1)
+            + " downto 0);\n"
+        )
+        d_t += "shared variable " + mem + " : t_" + self.name + "_mem;\n"
+        parent.add_templ("signal_decls", d_t, 4)
+        # Ports for the user logic
+        d_t = self.name + "_clk_i : in  std_logic;\n"
+        d_t += (
+            self.name + "_addr_i : in  std_logic_vector(" + str(self.adr_bits - 1) + " downto 0);\n"
+        )
+        d_t += self.name + "_dat_i : in  std_logic_vector(" + str(self.width - 1) + " downto 0);\n"
+        d_t += self.name + "_we_i : in  std_logic;\n"
+        d_t += self.name + "_dat_o : out std_logic_vector(" + str(self.width - 1) + " downto 0);\n"
+        parent.add_templ("signal_ports", d_t, 6)
+        # Wishbone port
+        d_t = "-- Wishbone access to the memory " + self.name + "\n"
+        d_t += "process(clk_sys_i)\n"
+        d_t += "begin\n"
+        d_t += "  if rising_edge(clk_sys_i) then\n"
+        d_t += "    if rst_n_i = '0' then\n"
+        d_t += "      " + wbi + " <= c_DUMMY_WB_MASTER_IN;\n"
+        d_t += "    else\n"
+        d_t += "      " + wbi + ".ack <= '0';\n"
+        d_t += "      " + wbi + ".err <= '0';\n"
+        d_t += "      if (" + wbo + ".cyc = '1') and (" + wbo + ".stb = '1')\n"
+        d_t += "          and (" + wbi + ".ack = '0') and (" + wbi + ".err = '0') then\n"
+        ind = "        "
+        if self.depth < self.addr_size:
+            d_t += ind + "if unsigned(" + wadr + ") < " + str(self.depth) + " then\n"
+            ind += "  "
+        # The data are read before they are written (read-first mode)
+        d_t += ind + wbi + ".dat <= (others => '0');\n"
+        d_t += ind + wbi + ".dat(" + str(self.width - 1) + " downto 0) <= " + widx + ";\n"
+        d_t += ind + "if " + wbo + ".we = '1' then\n"
+        # Only the selected bytes are written
+        for i in range((self.width + 7) // 8):
+            hbit = str(min(8 * i + 7, self.width - 1)) + " downto " + str(8 * i)
+            d_t += ind + "  if " + wbo + ".sel(" + str(i) + ") = '1' then\n"
+            d_t += ind + "    " + widx + "(" + hbit + ") := " + wbo + ".dat(" + hbit + ");\n"
+            d_t += ind + "  end if;\n"
+        d_t += ind + "end if;\n"
+        d_t += ind + wbi + ".ack <= '1';\n"
+        if self.depth < self.addr_size:
+            d_t += "        else\n"
+            d_t += "          " + wbi + ".err <= '1';\n"
+            d_t += "        end if;\n"
+        d_t += "      end if;\n"
+        d_t += "    end if;\n"
+        d_t += "  end if;\n"
+        d_t += "end process;\n\n"
+        # User port
+        uidx = mem + "(to_integer(unsigned(" + self.name + "_addr_i)))"
+        d_t += "-- User access to the memory " + self.name + "\n"
+        d_t += "process(" + self.name + "_clk_i)\n"
+        d_t += "begin\n"
+        d_t += "  if rising_edge(" + self.name + "_clk_i) then\n"
+        d_t += "    " + self.name + "_dat_o <= " + uidx + ";\n"
+        d_t += "    if " + self.name + "_we_i = '1' then\n"
+        d_t += "      " + uidx + " := " + self.name + "_dat_i;\n"
+        d_t += "    end if;\n"
+        d_t += "  end if;\n"
+        d_t += "end process;\n"
+        parent.add_templ("cont_assigns", d_t, 4)
+
+    def gen_c_header(self, block_name):
+        """
+        The method generates the array giving access to the memory,
+        and the functions copying the data from and to the memory
+        with memcpy (the compiler barriers ensure that the accesses
+        are not moved or removed by the compiler).
+        """
+        res = "  " + XVOLATILE + " " + c_word() + " " + self.name + "[" + str(self.depth) + "];\n"
+        fname = "agwb_" + block_name + "_" + self.name
+        head = "const uint32_t " + fname + "_DEPTH = " + str(self.depth) + ";\n"
+        head += (
+            "static inline void "
+            + fname
+            + "_read(agwb_"
+            + block_name
+            + " * blk, uint32_t offset, "
+            + c_word()
+            + " * dst, uint32_t n) { \n"
+        )
+        head += '  __asm__ volatile ("" ::: "memory");\n'
+        head += (
+            "  memcpy(dst, (const void *) &blk->"
+            + self.name
+            + "[offset], n * sizeof("
+            + c_word()
+            + "));\n"
+        )
+        head += '  __asm__ volatile ("" ::: "memory");\n'
+        head += "};\n"
+        head += (
+            "static inline void "
+            + fname
+            + "_write(agwb_"
+            + block_name
+            + " * blk, uint32_t offset, const "
+            + c_word()
+            + " * src, uint32_t n) { \n"
+        )
+        head += '  __asm__ volatile ("" ::: "memory");\n'
+        head += (
+            "  memcpy((void *) &blk->"
+            + self.name
+            + "[offset], src, n * sizeof("
+            + c_word()
+            + "));\n"
+        )
+        head += '  __asm__ volatile ("" ::: "memory");\n'
+        head += "};\n"
+        return res, head
+
+    def gen_html(self, base, name):
+        res = (
+            "Address: "
+            + hex(base)
+            + " Name: "
+            + name
+            + " Memory: "
+            + str(self.depth)
+            + " x "
+            + str(self.width)
+            + " bits<br>"
+        )
+        res += "<p>" + self.desc + "</p>"
+        return res
+
+
 class WbBlock(WbObject):
     def __init__(self, el):
         """
@@ -1073,12 +1889,17 @@ class WbBlock(WbObject):
             if child.tag == "creg":
                 # This is a control register
                 reg = WbReg(child, self.free_reg_addr)
-                self.free_reg_addr += reg.size
+                self.free_reg_addr += reg.addr_size
                 self.regs.append(reg)
             elif child.tag == "sreg":
                 # This is a status register
                 reg = WbReg(child, self.free_reg_addr)
-                self.free_reg_addr += reg.size
+                self.free_reg_addr += reg.addr_size
+                self.regs.append(reg)
+            elif child.tag == "fifo":
+                # This is a FIFO port
+                reg = WbReg(child, self.free_reg_addr)
+                self.free_reg_addr += reg.addr_size
                 self.regs.append(reg)
             elif child.tag == "subblock":
                 # This is a subblock definition
@@ -1088,9 +1909,18 @@ class WbBlock(WbObject):
                 # This is a blackbox subblock definition
                 # We only add it to the list, the addresses can't be allocated yet
                 self.subblks.append(child)
+            elif child.tag == "memory":
+                # This is a memory area
+                # We only add it to the list, the addresses can't be allocated yet
+                self.subblks.append(child)
             else:
                 # Unknown child
                 raise Exception("Unknown node in block: " + el.name)
+        # Collect the registers of snapshot groups (in the order of addresses)
+        self.snapshots = {}
+        for reg in self.regs:
+            if reg.snapshot is not None:
+                self.snapshots.setdefault(reg.snapshot, []).append(reg)
         # After that procedure, the field free_reg_addr contains
         # the length of the block of internal registers
         self.reg_adr_bits = (self.free_reg_addr - 1).bit_length()
@@ -1143,6 +1973,9 @@ class WbBlock(WbObject):
                 self.areas.append(
                     WbArea(addr_size, sblk.get("name"), b_l, reps, ignore, force_vec)
                 )
+            elif sblk.tag == "memory":
+                mem = WbMemory(sblk)
+                self.areas.append(WbArea(mem.addr_size, mem.name, mem, 1, mem.ignore))
             else:
                 raise Exception("Unknown type of subblock")
         # In that version we use a more complex address allocation scheme
@@ -1242,6 +2075,10 @@ class WbBlock(WbObject):
                 n_ports += 1
                 ar_addresses.append(a_r.adr)
                 ar_adr_bits.append(a_r.adr_bits)
+                if isinstance(a_r.obj, WbMemory):
+                    # The memory is implemented inside the block
+                    a_r.obj.gen_vhdl(self, a_r.first_port)
+                    continue
                 # generate the entity port but not for internal registers
                 if a_r.obj != None:
                     d_t = a_r.name + "_wb_m_o : out t_wishbone_master_out;\n"
@@ -1327,8 +2164,11 @@ class WbBlock(WbObject):
         )
         self.add_templ("reg_adr_bits", str(self.reg_adr_bits), 0)
         self.add_templ("p_adr_bits", str(self.adr_bits), 0)
-        self.add_templ("block_id", 'x"' + format(self.id_val, "08x") + '"', 0)
-        self.add_templ("block_ver", 'x"' + format(GLB.VER_ID, "08x") + '"', 0)
+        # ID and VER are extended to the width of the data bus
+        dfmt = "0" + str(GLB.DATA_WIDTH // 4) + "x"
+        self.add_templ("block_id", 'x"' + format(self.id_val, dfmt) + '"', 0)
+        self.add_templ("block_ver", 'x"' + format(GLB.VER_ID, dfmt) + '"', 0)
+        self.add_templ("dat_unmapped", 'x"' + (GLB.DATA_WIDTH // 8) * "A5" + '"', 0)
         self.add_templ("p_addresses", adrs, 0)
         self.add_templ("p_masks", masks, 0)
         self.add_templ("p_registered", "false", 0)
@@ -1376,6 +2216,18 @@ class WbBlock(WbObject):
                 # Now add other registers in a loop
                 for reg in self.regs:
                     res += reg.gen_ipbus_xml(adr)
+                # Optionally add the node covering the whole registers area,
+                # so all registers may be read with a single block transfer.
+                # It is skipped if reading of any register is not allowed
+                # or consumes the data (FIFO ports).
+                if GLB.IPBUS_AREA and not any(reg.fifo for reg in self.regs):
+                    if any(reg.name == "REGS" for reg in self.regs):
+                        raise Exception(
+                            "Register REGS in block " + self.name + " conflicts with the registers area node"
+                        )
+                    res += ipbus_block_node("REGS", adr, self.free_reg_addr, "r")
+            elif isinstance(a_r.obj, WbMemory):
+                res += ipbus_block_node(a_r.name, a_r.adr, a_r.obj.depth, "rw")
             else:
                 # Subblock or vector of subblocks
                 # If it is a subblock, prefix the name of the table with "agwb_"
@@ -1463,6 +2315,20 @@ class WbBlock(WbObject):
                 # Now add other registers in a loop
                 for reg in self.regs:
                     cdefs += reg.gen_forth(adr, parent)
+            elif isinstance(a_r.obj, WbMemory):
+                if not a_r.is_ignored("forth"):
+                    # Memory is handled like the vector of registers
+                    cdefs += (
+                        ": "
+                        + parent
+                        + "#"
+                        + a_r.name
+                        + " "
+                        + parent
+                        + " + $"
+                        + format(a_r.adr, "x")
+                        + " + ;\n"
+                    )
             elif not a_r.is_ignored("forth"):
                 # Subblock or vector of subblocks
                 if (a_r.reps == 1) and (a_r.force_vec == False):
@@ -1518,6 +2384,8 @@ class WbBlock(WbObject):
         filler_nr = 1
         cur_addr = 0
         res = "typedef struct {\n"
+        # Functions, that must be defined after the structure
+        funcs = ""
         # The areas must be sorted by increasing address
         self.areas.sort(key=WbArea.sort_adr)
         for a_r in self.areas:
@@ -1530,7 +2398,9 @@ class WbBlock(WbObject):
                 res += (
                     "  "
                     + XVOLATILE
-                    + " uint32_t filler"
+                    + " "
+                    + c_word()
+                    + " filler"
                     + str(filler_nr)
                     + "["
                     + str(a_r.adr - cur_addr)
@@ -1542,15 +2412,23 @@ class WbBlock(WbObject):
                 # Registers area
                 # Add two standard registers - ID and VER
                 adr = a_r.adr
-                res += "  " + XVOLATILE + " uint32_t ID;\n"
-                res += "  " + XVOLATILE + " uint32_t VER;\n"
+                res += "  " + XVOLATILE + " " + c_word() + " ID;\n"
+                res += "  " + XVOLATILE + " " + c_word() + " VER;\n"
                 cur_addr += 2
                 # Now add other registers in a loop
                 for reg in self.regs:
                     r_n, h_n = reg.gen_c_header(adr, self.name)
                     head += h_n
                     res += r_n
-                    cur_addr += reg.size
+                    cur_addr += reg.addr_size
+            elif isinstance(a_r.obj, WbMemory):
+                # The memory access functions use memcpy
+                if "#include <string.h>\n" not in head:
+                    head += "#include <string.h>\n"
+                r_n, h_n = a_r.obj.gen_c_header(self.name)
+                res += r_n
+                funcs += h_n
+                cur_addr += a_r.obj.depth
             else:
                 # Subblock or vector of subblocks
                 # Add the related header
@@ -1584,7 +2462,9 @@ class WbBlock(WbObject):
             res += (
                 "  "
                 + XVOLATILE
-                + " uint32_t filler"
+                + " "
+                + c_word()
+                + " filler"
                 + str(filler_nr)
                 + "["
                 + str(self.addr_size - cur_addr)
@@ -1592,13 +2472,469 @@ class WbBlock(WbObject):
             )
             filler_nr += 1
         cur_addr = self.addr_size
-        res += "} __attribute__((aligned(4))) agwb_" + self.name + " ;\n"
+        res += (
+            "} __attribute__((aligned("
+            + str(GLB.DATA_WIDTH // 8)
+            + "))) agwb_"
+            + self.name
+            + " ;\n"
+        )
+        res += funcs
+        res += self.gen_c_bulk()
+        # Generate functions reading the snapshot groups
+        for g_n, group in self.snapshots.items():
+            size = sum(reg.size for reg in group)
+            res += (
+                "const uint32_t agwb_"
+                + self.name
+                + "_"
+                + g_n
+                + "_SIZE = "
+                + str(size)
+                + ";\n"
+            )
+            res += (
+                "/* Reads the snapshot group "
+                + g_n
+                + " into dst["
+                + str(size)
+                + "]: "
+                + ", ".join(reg.name for reg in group)
+                + ".\n   Reading of "
+                + group[0].name
+                + " latches the whole group. */\n"
+            )
+            res += (
+                "static inline void agwb_"
+                + self.name
+                + "_read_"
+                + g_n
+                + "(agwb_"
+                + self.name
+                + " * blk, "
+                + c_word()
+                + " * dst) { \n"
+            )
+            k = 0
+            for reg in group:
+                for i in range(reg.size):
+                    if reg.force_vec:
+                        ind = "[" + str(i) + "]"
+                    else:
+                        ind = ""
+                    res += "  dst[" + str(k) + "] = blk->" + reg.name + ind + ";\n"
+                    k += 1
+            res += "};\n"
         res += "#endif\n"
         log.debug("block: " + self.name + " cur_addr=" + str(cur_addr))
         with open(GLB.C_HEADER_PATH + "/agwb_" + self.name + ".h", "w") as f_o:
             f_o.write(head)
             f_o.write(res)
 
+    def regs_runs(self, writable):
+        """ Returns the list of contiguous runs (offset, length) of registers
+        in the registers area, that may be read (if writable is False)
+        or written (if writable is True) in bulk.
+        FIFO ports and SET/CLR/TOGGLE aliases are skipped.
+        """
+        offs = [] if writable else [0, 1]
+        for reg in self.regs:
+            if reg.fifo or (writable and reg.regtype != "creg"):
+                continue
+            offs += range(reg.base, reg.base + reg.size)
+        runs = []
+        for off in offs:
+            if runs and runs[-1][0] + runs[-1][1] == off:
+                runs[-1][1] += 1
+            else:
+                runs.append([off, 1])
+        return runs
+
+    def regs_all_size(self):
+        """ Returns the size of the buffer used by the recursive bulk
+        transfers of the registers: the registers area of the block,
+        followed by the buffers of all subblocks (in order of addresses).
+        """
+        size = self.free_reg_addr
+        for a_r in self.areas:
+            if isinstance(a_r.obj, WbBlock):
+                size += a_r.reps * a_r.obj.regs_all_size()
+        return size
+
+    def gen_c_bulk(self):
+        """ This function generates the C functions copying the whole
+        registers area to or from the buffer with the plain loops.
+        The accesses are not volatile (unless AGWB_BULK_VOLATILE is defined),
+        but are surrounded with AGWB_BARRIER() (by default the compiler barrier).
+        """
+        res = "#ifndef AGWB_BARRIER\n"
+        res += '#define AGWB_BARRIER() __asm__ volatile ("" ::: "memory")\n'
+        res += "#endif\n"
+        res += "#ifndef AGWB_BULK\n"
+        res += "#ifdef AGWB_BULK_VOLATILE\n"
+        res += "#define AGWB_BULK volatile\n"
+        res += "#else\n"
+        res += "#define AGWB_BULK\n"
+        res += "#endif\n"
+        res += "#endif\n"
+        bname = "agwb_" + self.name
+        # Address of the registers area
+        regs_adr = [a_r.adr for a_r in self.areas if a_r.obj is None][0]
+        res += (
+            "const uint32_t " + bname + "_REGS_SIZE = " + str(self.free_reg_addr) + ";\n"
+        )
+        res += (
+            "const uint32_t "
+            + bname
+            + "_REGS_ALL_SIZE = "
+            + str(self.regs_all_size())
+            + ";\n"
+        )
+        for writable in (False, True):
+            if writable:
+                res += (
+                    "/* Writes the control registers from src["
+                    + str(self.free_reg_addr)
+                    + "] (src[i] - the word at offset i in the registers area).\n"
+                    + "   FIFO ports and SET/CLR/TOGGLE aliases are not written. */\n"
+                )
+                fname = "_write_cregs"
+                args = "(" + bname + " * blk, const " + c_word() + " * src) {\n"
+                ptr = (
+                    "  AGWB_BULK "
+                    + c_word()
+                    + " * regs = (AGWB_BULK "
+                    + c_word()
+                    + " *) blk + "
+                    + str(regs_adr)
+                    + ";\n"
+                )
+                copy = "regs[i] = src[i];\n"
+            else:
+                res += (
+                    "/* Reads the registers area into dst["
+                    + str(self.free_reg_addr)
+                    + "] (dst[i] - the word at offset i).\n"
+                    + "   FIFO ports and SET/CLR/TOGGLE aliases are not read. */\n"
+                )
+                fname = "_read_regs"
+                args = "(" + bname + " * blk, " + c_word() + " * dst) {\n"
+                ptr = (
+                    "  const AGWB_BULK "
+                    + c_word()
+                    + " * regs = (const AGWB_BULK "
+                    + c_word()
+                    + " *) blk + "
+                    + str(regs_adr)
+                    + ";\n"
+                )
+                copy = "dst[i] = regs[i];\n"
+            runs = self.regs_runs(writable)
+            res += "static inline void " + bname + fname + args
+            if runs:
+                res += ptr
+                res += "  unsigned int i;\n"
+                res += "  AGWB_BARRIER();\n"
+                for off, num in runs:
+                    res += (
+                        "  for (i = "
+                        + str(off)
+                        + "; i < "
+                        + str(off + num)
+                        + "; i++) "
+                        + copy
+                    )
+                res += "  AGWB_BARRIER();\n"
+            res += "};\n"
+        # Recursive variants, handling also the subblocks
+        for writable in (False, True):
+            if writable:
+                res += (
+                    "/* Writes the control registers of the block and of all its subblocks\n"
+                    + "   from src["
+                    + str(self.regs_all_size())
+                    + "] (filled by "
+                    + bname
+                    + "_read_regs_all). */\n"
+                )
+                fname = "_write_cregs"
+                buf = "src"
+                args = "(" + bname + " * blk, const " + c_word() + " * src) {\n"
+            else:
+                res += (
+                    "/* Reads the registers areas of the block and of all its subblocks\n"
+                    + "   into dst["
+                    + str(self.regs_all_size())
+                    + "]: the registers area of the block, followed by the data\n"
+                    + "   of subblocks (in order of addresses). */\n"
+                )
+                fname = "_read_regs"
+                buf = "dst"
+                args = "(" + bname + " * blk, " + c_word() + " * dst) {\n"
+            res += "static inline void " + bname + fname + "_all" + args
+            if any(
+                isinstance(a_r.obj, WbBlock) and (a_r.reps != 1 or a_r.force_vec)
+                for a_r in self.areas
+            ):
+                res += "  unsigned int i;\n"
+            res += "  " + bname + fname + "(blk, " + buf + ");\n"
+            off = self.free_reg_addr
+            for a_r in self.areas:
+                if not isinstance(a_r.obj, WbBlock):
+                    continue
+                sub = "agwb_" + a_r.obj.name + fname + "_all"
+                sub_size = a_r.obj.regs_all_size()
+                if (a_r.reps == 1) and (a_r.force_vec == False):
+                    res += "  " + sub + "(&blk->" + a_r.name + ", " + buf + " + " + str(off) + ");\n"
+                else:
+                    res += (
+                        "  for (i = 0; i < "
+                        + str(a_r.reps)
+                        + "; i++) "
+                        + sub
+                        + "(&blk->"
+                        + a_r.name
+                        + "[i], "
+                        + buf
+                        + " + "
+                        + str(off)
+                        + " + i * "
+                        + str(sub_size)
+                        + ");\n"
+                    )
+                off += a_r.reps * sub_size
+            res += "};\n"
+        return res
+
+    def c_path_entries(self, prefix, offset, dims):
+        """ Returns the list of entries (path, offset, dims, mask, shift, flags)
+        describing the registers, fields and subblocks of the block
+        for the path lookup tables (see targets/c/agwb_paths.h).
+        Indices are removed from paths, and dims is the list of (count, stride)
+        for each index.
+        """
+        # Flags as defined in agwb_paths.h
+        f_read, f_write, f_field, f_signed, f_fifo, f_block = 1, 2, 4, 8, 16, 32
+        res = []
+        if len(dims) > 4:
+            raise Exception("Too many indices in path " + prefix + " for the path lookup tables")
+        for a_r in self.areas:
+            adr = offset + a_r.adr
+            if a_r.obj is None:
+                # Registers area
+                wmask = (1 << GLB.DATA_WIDTH) - 1
+                res.append((prefix + "ID", adr, dims, wmask, 0, f_read))
+                res.append((prefix + "VER", adr + 1, dims, wmask, 0, f_read))
+                for reg in self.regs:
+                    if reg.fifo and reg.regtype == "creg":
+                        flags = f_write | f_fifo
+                    elif reg.fifo:
+                        flags = f_read | f_fifo
+                    elif reg.regtype == "creg":
+                        flags = f_read | f_write
+                    else:
+                        flags = f_read
+                    name = prefix + reg.name
+                    rdims = dims
+                    if reg.force_vec:
+                        name += "[]"
+                        rdims = dims + [(reg.size, 1)]
+                        if len(rdims) > 4:
+                            raise Exception("Too many indices in path " + name)
+                    radr = adr + reg.base
+                    res.append((name, radr, rdims, (1 << reg.width) - 1, 0, flags))
+                    for b_f in reg.fields:
+                        fflags = flags | f_field
+                        if b_f.type == "signed":
+                            fflags |= f_signed
+                        fmask = ((1 << b_f.size) - 1) << b_f.lsb
+                        res.append(
+                            (name + "." + b_f.name, radr, rdims, fmask, b_f.lsb, fflags)
+                        )
+                    if reg.bitops == 1:
+                        for k, aname in enumerate(("SET", "CLR", "TOGGLE"), 1):
+                            aname = prefix + reg.name + "_" + aname
+                            if reg.force_vec:
+                                aname += "[]"
+                            res.append(
+                                (
+                                    aname,
+                                    radr + k * reg.size,
+                                    rdims,
+                                    (1 << reg.width) - 1,
+                                    0,
+                                    f_read | f_write,
+                                )
+                            )
+            elif isinstance(a_r.obj, WbMemory):
+                if len(dims) > 3:
+                    raise Exception("Too many indices in path " + prefix + a_r.name)
+                res.append(
+                    (
+                        prefix + a_r.name + "[]",
+                        adr,
+                        dims + [(a_r.obj.depth, 1)],
+                        (1 << a_r.obj.width) - 1,
+                        0,
+                        f_read | f_write,
+                    )
+                )
+            else:
+                # Subblock or blackbox (or the vector of them)
+                name = prefix + a_r.name
+                sdims = dims
+                if (a_r.reps != 1) or a_r.force_vec:
+                    name += "[]"
+                    sdims = dims + [(a_r.reps, a_r.obj.addr_size)]
+                    if len(sdims) > 4:
+                        raise Exception("Too many indices in path " + name)
+                res.append((name, adr, sdims, 0, 0, f_block))
+                if isinstance(a_r.obj, WbBlock):
+                    res += a_r.obj.c_path_entries(name + ".", adr, sdims)
+        return res
+
+    def gen_c_paths(self):
+        """ This function generates the C header with the perfect hash table
+        of paths of registers, fields and subblocks of the block.
+        """
+        entries = {}
+        for ent in self.c_path_entries("", 0, []):
+            if ent[0] in entries:
+                raise Exception("Duplicated path " + ent[0] + " in block " + self.name)
+            entries[ent[0]] = ent
+        slots, disp = build_chd(list(entries))
+        bname = "agwb_" + self.name
+        res = "#ifndef __" + self.name + "_PATHS__INC_H\n"
+        res += "#define __" + self.name + "_PATHS__INC_H\n"
+        res += '#include "agwb_paths.h"\n'
+        res += (
+            "static const agwb_path_entry "
+            + bname
+            + "_path_entries["
+            + str(len(slots))
+            + "] = {\n"
+        )
+        for key in slots:
+            if key is None:
+                res += "  {NULL},\n"
+                continue
+            path, adr, dims, mask, shift, flags = entries[key]
+            res += (
+                '  {"'
+                + path
+                + '", '
+                + hex(adr)
+                + ", {"
+                + (", ".join(str(d[0]) for d in dims) or "0")
+                + "}, {"
+                + (", ".join(hex(d[1]) for d in dims) or "0")
+                + "}, "
+                + hex(mask)
+                + ", "
+                + str(len(dims))
+                + ", "
+                + str(shift)
+                + ", "
+                + hex(flags)
+                + "},\n"
+            )
+        res += "};\n"
+        res += (
+            "static const uint32_t "
+            + bname
+            + "_path_disp["
+            + str(len(disp))
+            + "] = {"
+            + ", ".join(str(d) for d in disp)
+            + "};\n"
+        )
+        res += (
+            "static const agwb_path_table "
+            + bname
+            + "_paths = {"
+            + bname
+            + "_path_entries, "
+            + str(len(slots))
+            + ", "
+            + bname
+            + "_path_disp, "
+            + str(len(disp))
+            + "};\n"
+        )
+        res += "#endif\n"
+        with open(GLB.C_HEADER_PATH + "/agwb_" + self.name + "_paths.h", "w") as f_o:
+            f_o.write(res)
+
+    def gen_cpp_header(self):
+        """ This function generates the address map as the C++ header,
+        with the block described by the class template parametrized with
+        its base address. All offsets, strides and masks are known
+        at compile time (see targets/cpp/agwb.hpp).
+        """
+        wbytes = GLB.DATA_WIDTH // 8
+        head = "#ifndef __" + self.name + "__INC_HPP\n"
+        head += "#define __" + self.name + "__INC_HPP\n"
+        head += '#include "agwb.hpp"\n'
+        res = "namespace agwb {\n"
+        res += "template <std::uintptr_t BASE>\n"
+        res += "struct " + self.name + " {\n"
+        res += "  static constexpr std::uintptr_t ADDRESS = BASE;\n"
+        res += "  static constexpr std::size_t SIZE = " + str(self.addr_size) + ";\n"
+        res += "  static constexpr " + c_word() + " ID_VAL = " + hex(self.id_val) + ";\n"
+        res += "  static constexpr " + c_word() + " VER_VAL = " + hex(GLB.VER_ID) + ";\n"
+        self.areas.sort(key=WbArea.sort_adr)
+        for a_r in self.areas:
+            adr = "BASE + " + hex(a_r.adr * wbytes)
+            if a_r.obj is None:
+                # Registers area
+                # Add two standard registers - ID and VER
+                for k, rname in enumerate(("ID", "VER")):
+                    rdef = (
+                        "Reg<"
+                        + c_word()
+                        + ", BASE + "
+                        + hex((a_r.adr + k) * wbytes)
+                        + ", RO>"
+                    )
+                    res += "  " + rdef + " " + rname + "() const { return " + rdef + "(); }\n"
+                for reg in self.regs:
+                    res += reg.gen_cpp(a_r.adr)
+                continue
+            if isinstance(a_r.obj, WbMemory):
+                rdef = "Area<" + c_word() + ", " + adr + ", " + str(a_r.obj.depth) + ">"
+                if a_r.obj.desc:
+                    res += "  // " + a_r.obj.desc + "\n"
+                res += "  " + rdef + " " + a_r.name + "() const { return " + rdef + "(); }\n"
+                continue
+            # Subblock or blackbox (or the vector of them)
+            if isinstance(a_r.obj, WbBlock):
+                inc = '#include "agwb_' + a_r.obj.name + '.hpp"\n'
+                if inc not in head:
+                    head += inc
+            if (a_r.reps == 1) and (a_r.force_vec == False):
+                vec = False
+            else:
+                vec = True
+                adr += " + I * " + hex(a_r.obj.addr_size * wbytes)
+            if isinstance(a_r.obj, WbBlock):
+                rdef = a_r.obj.name + "<" + adr + ">"
+            else:
+                rdef = "Area<" + c_word() + ", " + adr + ", " + str(a_r.obj.addr_size) + ">"
+            if vec:
+                res += "  template <unsigned I>\n"
+                res += "  " + rdef + " " + a_r.name + "() const {\n"
+                res += '    static_assert(I < ' + str(a_r.reps) + ', "Index out of range");\n'
+                res += "    return " + rdef + "();\n"
+                res += "  }\n"
+            else:
+                res += "  " + rdef + " " + a_r.name + "() const { return " + rdef + "(); }\n"
+        res += "};\n"
+        res += "} // namespace agwb\n"
+        res += "#endif\n"
+        with open(GLB.CPP_PATH + "/agwb_" + self.name + ".hpp", "w") as f_o:
+            f_o.write(head)
+            f_o.write(res)
+
     def gen_python(self):
         """ This function generates the class providing access
         to the block from the Python code"""
@@ -1618,6 +2954,17 @@ class WbBlock(WbObject):
                 res += sp8 + "'VER':(" + hex(adr + 1) + ",(agwb.StatusRegister,)),\\\n"
                 for reg in self.regs:
                     res += reg.gen_python(adr)
+            elif isinstance(a_r.obj, WbMemory):
+                res += (
+                    sp8
+                    + "'"
+                    + a_r.name
+                    + "':("
+                    + hex(a_r.adr)
+                    + ",(agwb.Memory,"
+                    + str(a_r.obj.depth)
+                    + ")),\\\n"
+                )
             else:
                 # The format depends on whether this is a block or vector of blocks
                 if (a_r.reps == 1) and (a_r.force_vec == False):
@@ -1646,7 +2993,109 @@ class WbBlock(WbObject):
                         + a_r.obj.name
                         + ",)),\\\n"
                     )
-        res += sp4 + "}\n\n"
+        res += sp4 + "}\n"
+        if self.snapshots:
+            # Registers of snapshot groups, the first one latches the group
+            res += sp4 + "x__snapshots = {\n"
+            for g_n, group in self.snapshots.items():
+                res += (
+                    sp8
+                    + "'"
+                    + g_n
+                    + "':("
+                    + "".join("'" + reg.name + "'," for reg in group)
+                    + "),\n"
+                )
+            res += sp4 + "}\n"
+        res += "\n"
+        return res
+
+    def gen_python_emul(self):
+        """ This function generates the description of the block
+        used by the Python emulator of the register file"""
+        sp4 = 4 * " "
+        sp8 = 8 * " "
+        regs = ""
+        subblks = ""
+        bboxes = ""
+        bitops = ""
+        snapshots = ""
+        fifos = ""
+        memories = ""
+        for a_r in self.areas:
+            if a_r.obj is None:
+                # ID and VER are emulated as status registers with fixed values
+                for r_n, r_v in (("ID", self.id_val), ("VER", GLB.VER_ID)):
+                    regs += (
+                        sp8
+                        + "("
+                        + hex(a_r.adr + (r_n == "VER"))
+                        + ",'"
+                        + r_n
+                        + "',1,False,False,"
+                        + hex(r_v)
+                        + ",0xffffffff),\n"
+                    )
+                for reg in self.regs:
+                    if reg.fifo:
+                        fifos += reg.gen_python_emul(a_r.adr)
+                    else:
+                        regs += reg.gen_python_emul(a_r.adr)
+                    if reg.bitops == 1:
+                        bitops += (
+                            sp8 + "(" + hex(a_r.adr + reg.base) + "," + str(reg.size) + "),\n"
+                        )
+                for group in self.snapshots.values():
+                    snapshots += (
+                        sp8
+                        + "("
+                        + "".join(
+                            "(" + hex(a_r.adr + reg.base) + "," + str(reg.size) + "),"
+                            for reg in group
+                        )
+                        + "),\n"
+                    )
+            else:
+                d_t = (
+                    sp8
+                    + "("
+                    + hex(a_r.adr)
+                    + ",'"
+                    + a_r.name
+                    + "',"
+                    + str(a_r.reps)
+                    + ","
+                    + str(a_r.force_vec)
+                    + ","
+                )
+                if isinstance(a_r.obj, WbBlock):
+                    subblks += d_t + a_r.obj.name + "),\n"
+                elif isinstance(a_r.obj, WbMemory):
+                    memories += (
+                        sp8
+                        + "("
+                        + hex(a_r.adr)
+                        + ",'"
+                        + a_r.name
+                        + "',"
+                        + str(a_r.obj.depth)
+                        + ","
+                        + str(a_r.obj.width)
+                        + "),\n"
+                    )
+                else:
+                    bboxes += d_t + str(a_r.obj.addr_size) + "),\n"
+        res = "\nclass " + self.name + "(emul.BlockDesc):\n"
+        res += sp4 + "x__size = " + str(self.addr_size) + "\n"
+        res += sp4 + "x__id = " + hex(self.id_val) + "\n"
+        res += sp4 + "x__ver = " + hex(GLB.VER_ID) + "\n"
+        res += sp4 + "x__regs = (\n" + regs + sp4 + ")\n"
+        res += sp4 + "x__subblocks = (\n" + subblks + sp4 + ")\n"
+        res += sp4 + "x__blackboxes = (\n" + bboxes + sp4 + ")\n"
+        res += sp4 + "x__bitops = (\n" + bitops + sp4 + ")\n"
+        res += sp4 + "x__snapshots = (\n" + snapshots + sp4 + ")\n"
+        res += sp4 + "x__fifos = (\n" + fifos + sp4 + ")\n"
+        res += sp4 + "x__memories = (\n" + memories + sp4 + ")\n\n"
         return res
 
     def gen_html(self, base, mname):
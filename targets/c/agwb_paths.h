@@ -0,0 +1,114 @@
+/*
+ * Lookup of registers by their paths (e.g. "LINKS[3].CTRL.START"),
+ * used with the tables agwb_{block_name}_paths.h generated by addr_gen_wb
+ * with the --c_paths argument.
+ *
+ * The tables are constant and indexed with the perfect hash (CHD - hash,
+ * displace and compress), so the lookup needs no initialization and takes
+ * constant time (besides parsing of the path).
+ * The indices are removed from the path before hashing ("LINKS[].CTRL.START"),
+ * so each vector is described by a single entry with the number of items
+ * and the stride for each index.
+ */
+#ifndef __AGWB_PATHS__INC_H
+#define __AGWB_PATHS__INC_H
+#include <stdint.h>
+#include <string.h>
+
+/* Maximum number of indices in the path */
+#define AGWB_PATH_DIMS 4
+/* Maximum length of the path without indices */
+#define AGWB_PATH_MAX 256
+
+/* Flags of entries */
+#define AGWB_PATH_READ 0x01   /* The register may be read */
+#define AGWB_PATH_WRITE 0x02  /* The register may be written */
+#define AGWB_PATH_FIELD 0x04  /* Bitfield of the register */
+#define AGWB_PATH_SIGNED 0x08 /* Signed bitfield */
+#define AGWB_PATH_FIFO 0x10   /* FIFO port */
+#define AGWB_PATH_BLOCK 0x20  /* Subblock (the offset is the base of the subblock) */
+
+/* Results of the lookup */
+#define AGWB_PATH_OK 0
+#define AGWB_PATH_NOT_FOUND -1
+#define AGWB_PATH_BAD_INDEX -2
+
+typedef struct {
+  const char * path;                /* Path without indices (NULL - empty slot) */
+  uint32_t offset;                  /* Offset (in words) from the base of the block */
+  uint32_t count[AGWB_PATH_DIMS];   /* Number of items for each index */
+  uint32_t stride[AGWB_PATH_DIMS];  /* Stride (in words) for each index */
+  uint64_t mask;                    /* Mask of the field (of all bits of the register) */
+  uint8_t ndims;                    /* Number of indices */
+  uint8_t shift;                    /* Position of the field */
+  uint8_t flags;                    /* AGWB_PATH_* flags */
+} agwb_path_entry;
+
+typedef struct {
+  const agwb_path_entry * entries;
+  uint32_t n_entries;
+  const uint32_t * disp;            /* Displacements of buckets */
+  uint32_t n_disp;
+} agwb_path_table;
+
+typedef struct {
+  const agwb_path_entry * entry;
+  uint32_t offset;                  /* Offset (in words) including the indices */
+  uint64_t mask;
+  uint8_t shift;
+  uint8_t flags;
+} agwb_path_result;
+
+/* FNV-1a hash with seed (the same function is used by the generator) */
+static inline uint32_t agwb_path_hash(const char * s, uint32_t seed) {
+  uint32_t h = 2166136261u ^ seed;
+  while (*s) {
+    h ^= (uint8_t) *s++;
+    h *= 16777619u;
+  }
+  return h;
+}
+
+/* Finds the register or field described by the path.
+   Returns AGWB_PATH_OK, AGWB_PATH_NOT_FOUND or AGWB_PATH_BAD_INDEX. */
+static inline int agwb_path_lookup(const agwb_path_table * t, const char * path,
+                                   agwb_path_result * res) {
+  char key[AGWB_PATH_MAX];
+  uint32_t idx[AGWB_PATH_DIMS];
+  unsigned int n = 0, ndims = 0, i;
+  const agwb_path_entry * e;
+  uint32_t h;
+  /* Remove indices from the path */
+  while (*path) {
+    if (n >= AGWB_PATH_MAX - 3)
+      return AGWB_PATH_NOT_FOUND;
+    key[n++] = *path;
+    if (*path++ == '[') {
+      uint32_t val = 0;
+      if ((ndims >= AGWB_PATH_DIMS) || (*path < '0') || (*path > '9'))
+        return AGWB_PATH_BAD_INDEX;
+      while ((*path >= '0') && (*path <= '9'))
+        val = 10 * val + (*path++ - '0');
+      if (*path != ']')
+        return AGWB_PATH_BAD_INDEX;
+      idx[ndims++] = val;
+    }
+  }
+  key[n] = 0;
+  h = agwb_path_hash(key, 0) % t->n_disp;
+  e = &t->entries[agwb_path_hash(key, t->disp[h]) % t->n_entries];
+  if ((e->path == NULL) || (strcmp(e->path, key) != 0) || (e->ndims != ndims))
+    return AGWB_PATH_NOT_FOUND;
+  res->offset = e->offset;
+  for (i = 0; i < ndims; i++) {
+    if (idx[i] >= e->count[i])
+      return AGWB_PATH_BAD_INDEX;
+    res->offset += idx[i] * e->stride[i];
+  }
+  res->entry = e;
+  res->mask = e->mask;
+  res->shift = e->shift;
+  res->flags = e->flags;
+  return AGWB_PATH_OK;
+}
+#endif
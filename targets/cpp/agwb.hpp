@@ -0,0 +1,158 @@
+/*
+ * Templates used by the C++ headers generated by addr_gen_wb.
+ * All addresses, strides and masks are template parameters, so the access
+ * to the register or to the bitfield compiles to the load and/or store
+ * at the address known at compile time.
+ * The bitfield is written with a single store only if the register has
+ * bitops="1" (the store to the SET or CLR alias, for single-bit fields).
+ * Without the aliases, the bitfield is written with load, modify and store.
+ * The indices of vectors are template parameters too, and are checked
+ * at compile time.
+ *
+ * Example:
+ *   agwb::MAIN<0x40000000> board;
+ *   board.LINKS<3>().CTRL().START() = 1; // Single store if CTRL has bitops="1"
+ *   uint32_t st = board.LINKS<3>().STATUS();
+ */
+#ifndef __AGWB__INC_HPP
+#define __AGWB__INC_HPP
+#include <cstddef>
+#include <cstdint>
+#include <type_traits>
+
+namespace agwb {
+
+// Access modes of registers
+enum : unsigned { RO = 1, WO = 2, RW = 3 };
+
+/*
+ * Bitfield of the register.
+ * W - type of the data word, ADDR - address of the register,
+ * LSB, WIDTH - position of the field, SIGNED - the field is signed,
+ * MODE - access mode of the register,
+ * ALIASES - distance (in bytes) between the register and its SET alias
+ * (0 - register without SET/CLR/TOGGLE aliases).
+ */
+template <typename W, std::uintptr_t ADDR, unsigned LSB, unsigned WIDTH,
+          bool SIGNED, unsigned MODE, std::uintptr_t ALIASES = 0>
+struct Field {
+  typedef typename std::conditional<SIGNED, typename std::make_signed<W>::type, W>::type value_type;
+  static constexpr W VMASK = (WIDTH >= 8 * sizeof(W)) ? ~W(0) : ((W(1) << WIDTH) - 1);
+  static constexpr W MASK = VMASK << LSB;
+  static constexpr unsigned SHIFT = LSB;
+  // Places the value in the field (to compose the value of the register)
+  static constexpr W val(value_type v) { return (W(v) & VMASK) << LSB; }
+
+  static volatile W &reg() { return *reinterpret_cast<volatile W *>(ADDR); }
+
+  value_type get() const {
+    static_assert(MODE & RO, "The register is write-only");
+    W res = (reg() >> LSB) & VMASK;
+    if (SIGNED && (WIDTH < 8 * sizeof(W)) && (res >> (WIDTH - 1)))
+      res |= ~VMASK;
+    return value_type(res);
+  }
+  operator value_type() const { return get(); }
+
+  void set(value_type v) const {
+    static_assert(MODE & WO, "The register is read-only");
+    W bits = val(v);
+    if (ALIASES) {
+      // The field is written via CLR and SET aliases, without reading the register.
+      // Single-bit fields (and values with all bits set or cleared) need one store.
+      // Other values need two, and the field is zero between them.
+      volatile W *set_alias = reinterpret_cast<volatile W *>(ADDR + ALIASES);
+      volatile W *clr_alias = reinterpret_cast<volatile W *>(ADDR + 2 * ALIASES);
+      if (bits != MASK)
+        *clr_alias = bits ^ MASK;
+      if (bits)
+        *set_alias = bits;
+    } else {
+      static_assert(ALIASES || (MODE & RO), "The field of the write-only register can't be modified");
+      reg() = (reg() & ~MASK) | bits;
+    }
+  }
+  const Field &operator=(value_type v) const {
+    set(v);
+    return *this;
+  }
+};
+
+/*
+ * Register. The register with bitfields is described by the derived
+ * class (generated), providing methods returning the fields.
+ */
+template <typename W, std::uintptr_t ADDR, unsigned MODE, std::uintptr_t ALIASES = 0>
+struct Reg {
+  typedef W value_type;
+  static constexpr std::uintptr_t ADDRESS = ADDR;
+
+  static volatile W &reg() { return *reinterpret_cast<volatile W *>(ADDR); }
+
+  W read() const {
+    static_assert(MODE & RO, "The register is write-only");
+    return reg();
+  }
+  operator W() const { return read(); }
+
+  void write(W v) const {
+    static_assert(MODE & WO, "The register is read-only");
+    reg() = v;
+  }
+  const Reg &operator=(W v) const {
+    write(v);
+    return *this;
+  }
+
+  // Modifies the bits selected by mask with a single load and store
+  // (or via CLR and SET aliases, if available)
+  void modify(W mask, W v) const {
+    static_assert(MODE == RW, "The register can't be modified");
+    if (ALIASES) {
+      if (mask & ~v)
+        *reinterpret_cast<volatile W *>(ADDR + 2 * ALIASES) = mask & ~v;
+      if (mask & v)
+        *reinterpret_cast<volatile W *>(ADDR + ALIASES) = mask & v;
+    } else {
+      reg() = (reg() & ~mask) | (v & mask);
+    }
+  }
+
+  // Access to the SET/CLR/TOGGLE aliases
+  void set_bits(W mask) const {
+    static_assert(ALIASES != 0, "The register has no bitops aliases");
+    *reinterpret_cast<volatile W *>(ADDR + ALIASES) = mask;
+  }
+  void clr_bits(W mask) const {
+    static_assert(ALIASES != 0, "The register has no bitops aliases");
+    *reinterpret_cast<volatile W *>(ADDR + 2 * ALIASES) = mask;
+  }
+  void toggle_bits(W mask) const {
+    static_assert(ALIASES != 0, "The register has no bitops aliases");
+    *reinterpret_cast<volatile W *>(ADDR + 3 * ALIASES) = mask;
+  }
+};
+
+/*
+ * Area of words accessed with the index known at run time
+ * (memories and blackboxes). The index may be also given
+ * as template parameter (checked at compile time).
+ */
+template <typename W, std::uintptr_t ADDR, std::size_t SIZE>
+struct Area {
+  typedef W value_type;
+  static constexpr std::uintptr_t ADDRESS = ADDR;
+  static constexpr std::size_t size() { return SIZE; }
+
+  volatile W &operator[](std::size_t i) const {
+    return reinterpret_cast<volatile W *>(ADDR)[i];
+  }
+  template <std::size_t I>
+  Reg<W, ADDR + I * sizeof(W), RW> at() const {
+    static_assert(I < SIZE, "Index out of range");
+    return {};
+  }
+};
+
+} // namespace agwb
+#endif
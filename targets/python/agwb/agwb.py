@@ -13,7 +13,273 @@ The interface must provide two methods:
 
 read(self,address) that returns 32-bit value
 write(self,address,value) that writes such a value
+(in systems with 64-bit data bus the values are 64-bit)
+
+Optionally, the interface may also provide the block transfer methods:
+
+read_block(self,address,count) that returns count values read
+    from consecutive addresses
+write_block(self,address,values) that writes values to consecutive
+    addresses
+
+If they are not available, the block transfers are emulated with
+single read/write calls.
+
+Similarly, the batched access to arbitrary addresses may be provided with:
+
+read_multi(self,addresses) that returns the values read from
+    all addresses in the sequence
+write_multi(self,addresses,values) that writes values to the
+    corresponding addresses
+
+The FIFO ports are accessed with the non-incrementing bursts, if provided:
+
+read_fifo(self,address,count) that returns count values read
+    from the same address
+write_fifo(self,address,values) that writes all values
+    to the same address
+
+If they are not available, the batched or single accesses are used.
+
+The read-modify-write sequences needed to write the bitfields
+may be delegated to the interface (e.g. to make them atomic) with:
+
+modify(self,address,mask,value) that replaces the bits selected
+    by mask in the word at address with the bits of value
+
+Bitfields occupying whole bytes may be written without reading
+the register, if the interface provides the partial-word write:
+
+write_sel(self,address,value,sel) that writes only the bytes of value
+    selected by the bits of sel (like the Wishbone sel lines)
 """
+import queue
+import threading
+import weakref
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    # NumPy is optional, it is needed only for the vectorized bitfield handling
+    numpy = None
+
+
+# Maximum number of words transferred in a single burst
+# by the FIFO and streaming transfers
+FIFO_CHUNK = 4096
+
+# Blocks, that were successfully verified in this session.
+# For each interface, the set of (base, class, version) tuples is stored.
+# The interfaces are referenced weakly, so the cache doesn't keep them alive.
+_verified = weakref.WeakKeyDictionary()
+
+
+def clear_verified(iface=None):
+    """Forget the cached results of verify_id_and_version(cache=True).
+
+    If iface is given, only the results for that interface are forgotten
+    (e.g. after reprogramming the FPGA accessed via that interface).
+    """
+    if iface is None:
+        _verified.clear()
+    else:
+        _verified.pop(iface, None)
+
+
+def _need_numpy():
+    if numpy is None:
+        raise Exception("NumPy is required for that operation")
+
+
+def _words(values):
+    """Convert the list of register values into the compact array.
+
+    32-bit words are stored in array('I'), and wider words
+    (in systems with 64-bit data bus) in array('Q').
+    """
+    try:
+        return array("I", values)
+    except OverflowError:
+        return array("Q", values)
+
+
+def _read_block(iface, base, count):
+    """Read count consecutive words starting at base.
+
+    The block transfer of the interface is used if available.
+    The result is returned as a compact array of words
+    (see _words, or any buffer returned directly by the interface).
+    """
+    if count == 0:
+        return array("I")
+    if hasattr(iface, "read_block"):
+        res = iface.read_block(base, count)
+        if isinstance(res, list):
+            res = _words(res)
+        return res
+    return _words([iface.read(base + i) for i in range(count)])
+
+
+def _write_block(iface, base, values):
+    """Write values to consecutive addresses starting at base."""
+    if len(values) == 0:
+        return
+    if hasattr(iface, "write_block"):
+        iface.write_block(base, values)
+        return
+    for i, val in enumerate(values):
+        iface.write(base + i, val)
+
+
+def _read_multi(iface, addrs):
+    """Read words from all addresses in addrs, in a single batch if possible."""
+    if hasattr(iface, "read_multi"):
+        res = iface.read_multi(addrs)
+        if isinstance(res, list):
+            res = _words(res)
+        return res
+    return _words([iface.read(adr) for adr in addrs])
+
+
+def _write_multi(iface, addrs, values):
+    """Write values to the corresponding addresses, in a single batch if possible."""
+    if hasattr(iface, "write_multi"):
+        iface.write_multi(addrs, values)
+        return
+    for adr, val in zip(addrs, values):
+        iface.write(adr, val)
+
+
+def _read_fifo(iface, address, count):
+    """Read count words from the FIFO port at address.
+
+    The non-incrementing burst of the interface is used if available,
+    otherwise the address is read count times in a single batch.
+    """
+    if count == 0:
+        return array("I")
+    if hasattr(iface, "read_fifo"):
+        res = iface.read_fifo(address, count)
+        if isinstance(res, list):
+            res = _words(res)
+        return res
+    return _read_multi(iface, count * [address])
+
+
+def _write_fifo(iface, address, values):
+    """Write values to the FIFO port at address."""
+    if len(values) == 0:
+        return
+    if hasattr(iface, "write_fifo"):
+        iface.write_fifo(address, values)
+        return
+    _write_multi(iface, len(values) * [address], values)
+
+
+def _fill(slot, part):
+    """Copy the words from part to the reusable buffer stored in slot[0].
+
+    The buffer is (re)allocated if it is too small or has a different word size.
+    Returns the memoryview of the copied words.
+    """
+    part = memoryview(part)
+    buf = slot[0]
+    if buf is None or len(buf) < len(part) or buf.typecode != part.format:
+        buf = slot[0] = array(part.format, bytes(part.nbytes))
+    view = memoryview(buf)[: len(part)]
+    view[:] = part
+    return view
+
+
+def _iter_chunks(read, total, chunk, prefetch):
+    """Yield total words read with read(first, count) in chunks of up to chunk words.
+
+    The words are stored in reusable buffers, and their memoryviews are yielded.
+    The view is valid until the next chunk is requested.
+    If prefetch is True, the next chunk is read in the background thread,
+    while the current one is processed (double buffering).
+    """
+    starts = range(0, total, chunk)
+    if not prefetch:
+        slot = [None]
+        for first in starts:
+            yield _fill(slot, read(first, min(chunk, total - first)))
+        return
+    # Two buffers: one is processed by the caller, the other is filled by the thread
+    free = queue.Queue()
+    ready = queue.Queue()
+    free.put([None])
+    free.put([None])
+
+    def reader():
+        try:
+            for first in starts:
+                slot = free.get()
+                if slot is None:
+                    return
+                ready.put((slot, _fill(slot, read(first, min(chunk, total - first)))))
+        except Exception as exc:
+            ready.put((None, exc))
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        for first in starts:
+            slot, data = ready.get()
+            if slot is None:
+                raise data
+            yield data
+            free.put(slot)
+    finally:
+        free.put(None)
+        thread.join()
+
+
+def _as_words(buffer):
+    """Return the memoryview of the buffer-protocol object, seen as the words.
+
+    Objects with 8-byte items are seen as 64-bit words, other ones (including
+    bytes and bytearray objects) as 32-bit words.
+    Other sequences (e.g. lists) are converted to the compact array of words.
+    """
+    try:
+        mv = memoryview(buffer)
+    except TypeError:
+        return _words(buffer)
+    if mv.format in ("I", "Q"):
+        return mv
+    if mv.itemsize == 8:
+        return mv.cast("B").cast("Q")
+    return mv.cast("B").cast("I")
+
+
+def _sel_mask(sel):
+    """Convert the byte select bits into the bit mask."""
+    mask = 0
+    for i in range(8):
+        if sel & (1 << i):
+            mask |= 0xFF << (8 * i)
+    return mask
+
+
+def _ranges(addrs):
+    """Split the sorted sequence of addresses into contiguous ranges.
+
+    Yields (first index, address, count) for each range.
+    """
+    first = 0
+    for i in range(1, len(addrs) + 1):
+        if i == len(addrs) or addrs[i] != addrs[i - 1] + 1:
+            yield first, addrs[first], i - first
+            first = i
+
+
+class BusError(Exception):
+    """Exception raised by the interface when the bus transaction fails.
+
+    It corresponds to the Wishbone ERR response, e.g. for the unmapped address.
+    """
 
 
 class BitField(object):
@@ -21,8 +287,8 @@ class BitField(object):
 
     Its fields contain certain precalculated values supporting quick
     handling of read and write access to the field.
-    That class does not provide any methods.
-    Only fields are used.
+    The get and put methods extract the field value from the register
+    value and insert it into the register value.
     """
 
     def __init__(self, msb, lsb, is_signed):
@@ -37,6 +303,77 @@ class BitField(object):
             self.vmax = (1 << (msb - lsb + 1)) - 1
             self.sign_mask = 0
         self.mask = ((1 << (msb + 1)) - 1) ^ ((1 << lsb) - 1)
+        # Byte lanes occupied by the field, if it consists of whole bytes
+        if lsb % 8 == 0 and (msb + 1) % 8 == 0:
+            self.sel = ((1 << ((msb + 1) // 8)) - 1) ^ ((1 << (lsb // 8)) - 1)
+        else:
+            self.sel = 0
+
+    def get(self, rval):
+        """Extract the value of the field from the register value rval."""
+        rval &= self.mask
+        rval >>= self.lsb
+        if self.sign_mask:
+            if rval & self.sign_mask:
+                rval -= self.sign_mask << 1
+        return rval
+
+    def put(self, rval, value):
+        """Return the register value rval with the field set to value."""
+        # Check if the value to be stored is correct
+        if (value < self.vmin) or (value > self.vmax):
+            raise Exception("Value doesn't fit in the bitfield")
+        # If the bitfield is signed, convert the negative values
+        if self.sign_mask:
+            if value < 0:
+                value += self.sign_mask << 1
+        # Mask the bitfield
+        rval |= self.mask
+        rval ^= self.mask
+        # Shift the new value
+        value = value << self.lsb
+        value &= self.mask
+        return rval | value
+
+    def decode(self, data):
+        """Extract the field from all register values in data.
+
+        data may be any sequence or buffer of register values
+        (e.g. result of a bulk read, or a stored dump).
+        Returns the NumPy array of field values (int64 for signed fields,
+        uint32 or uint64 for unsigned ones).
+        """
+        _need_numpy()
+        vals = (numpy.asarray(data).astype(self.dtype()) & self.mask) >> self.lsb
+        if not self.sign_mask:
+            return vals
+        vals = vals.astype(numpy.int64)
+        return numpy.where(vals & self.sign_mask, vals - (self.sign_mask << 1), vals)
+
+    def encode(self, values, data=None):
+        """Insert the field values into register values.
+
+        If data is None, the fields are inserted into zeroed register values.
+        Otherwise, the field in each word of data is replaced.
+        Returns the NumPy array of register values (uint32 or uint64).
+        """
+        _need_numpy()
+        wtype = self.dtype()
+        vals = numpy.asarray(values, dtype=numpy.int64)
+        if vals.size and (vals.min() < self.vmin or vals.max() > self.vmax):
+            raise Exception("Value doesn't fit in the bitfield")
+        vals = (vals.astype(wtype) << wtype(self.lsb)) & wtype(self.mask)
+        if data is None:
+            return vals
+        return (numpy.asarray(data).astype(wtype) & ~wtype(self.mask)) | vals
+
+    def dtype(self):
+        """Return the NumPy type of register values able to hold the field."""
+        _need_numpy()
+        # Fields above bit 31 exist only in systems with 64-bit data bus
+        if self.msb >= 32:
+            return numpy.uint64
+        return numpy.uint32
 
 
 class _BitFieldAccess(object):
@@ -52,59 +389,302 @@ class _BitFieldAccess(object):
         self.x__bf = bf
 
     def read(self):
-        rval = self.x__iface.read(self.x__base)
-        rval &= self.x__bf.mask
-        rval >>= self.x__bf.lsb
-        if self.x__bf.sign_mask:
-            if rval & self.x__bf.sign_mask:
-                rval -= self.x__bf.sign_mask << 1
-        return rval
+        return self.x__bf.get(self.x__iface.read(self.x__base))
+
+    def _write_sel(self, value):
+        """Write the field with the partial-word write, if possible."""
+        if self.x__bf.sel and hasattr(self.x__iface, "write_sel"):
+            self.x__iface.write_sel(self.x__base, self.x__bf.put(0, value), self.x__bf.sel)
+            return True
+        return False
 
     def write(self, value):
-        # Check if the value to be stored is correct
-        if (value < self.x__bf.vmin) or (value > self.x__bf.vmax):
-            raise Exception("Value doesn't fit in the bitfield")
-        # If the bitfield is signed, convert the negative values
-        if self.x__bf.sign_mask:
-            if value < 0:
-                value += self.x__bf.sign_mask << 1
-                print("final value: " + str(value))
-        # Read the whole register
+        if self._write_sel(value):
+            return
+        if hasattr(self.x__iface, "modify"):
+            # The interface performs the read-modify-write sequence itself
+            self.x__iface.modify(self.x__base, self.x__bf.mask, self.x__bf.put(0, value))
+            return
+        # Read the whole register, modify the field and write it back
         rval = self.x__iface.read(self.x__base)
-        # Mask the bitfield
-        rval |= self.x__bf.mask
-        rval ^= self.x__bf.mask
-        # Shift the new value
-        value = value << self.x__bf.lsb
-        value &= self.x__bf.mask
-        rval |= value
-        self.x__iface.write(self.x__base, rval)
+        self.x__iface.write(self.x__base, self.x__bf.put(rval, value))
+
+
+class _BitOpsFieldAccess(_BitFieldAccess):
+    """Class providing access to the bitfield in the register with SET/CLR/TOGGLE aliases.
+
+    The field is written without reading the register: the bits that must be
+    cleared are written to the CLR alias, and the bits that must be set
+    are written to the SET alias. Only single-bit fields (or values with all
+    bits of the field set or cleared) are updated with one write. Other values
+    need two writes, and between them the field is zero.
+    """
+
+    def __init__(self, iface, base, bf, alias_step):
+        _BitFieldAccess.__init__(self, iface, base, bf)
+        self.x__alias_step = alias_step
+
+    def write(self, value):
+        if self._write_sel(value):
+            return
+        val = self.x__bf.put(0, value)
+        clr = self.x__bf.mask & ~val
+        if clr:
+            self.x__iface.write(self.x__base + 2 * self.x__alias_step, clr)
+        if val:
+            self.x__iface.write(self.x__base + self.x__alias_step, val)
+
+
+class _Broadcast(object):
+    """Class providing simultaneous access to the same object in many items of a vector.
+
+    The object is described by the list of base addresses of the accessed items
+    and the class (with optional constructor arguments) of the object.
+    If nitems is not None, the object is itself a vector with nitems items,
+    that may be indexed (or sliced) further.
+    Access to the registers is performed in a single batch, using the
+    read_multi and write_multi methods of the interface if available.
+    The results are returned in the order of base addresses.
+    """
+
+    def __init__(self, iface, bases, margs, nitems=None):
+        self.x__iface = iface
+        self.x__bases = bases
+        self.x__mclass = margs[0]
+        self.x__margs = margs
+        self.x__nitems = nitems
+
+    def __len__(self):
+        return len(self.x__bases)
+
+    def __getitem__(self, key):
+        if self.x__nitems is None:
+            raise Exception("Only vectors may be indexed")
+        size = self.x__mclass.x__size
+        if isinstance(key, slice):
+            idxs = range(*key.indices(self.x__nitems))
+        else:
+            if key < 0:
+                key += self.x__nitems
+            if key < 0 or key >= self.x__nitems:
+                raise Exception("Access outside the vector")
+            idxs = (key,)
+        bases = [base + i * size for base in self.x__bases for i in idxs]
+        return _Broadcast(self.x__iface, bases, self.x__margs)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name.startswith("x__"):
+            raise AttributeError(name)
+        if self.x__nitems is not None:
+            # Broadcast to all items of the vector
+            return getattr(self[:], name)
+        if issubclass(self.x__mclass, _Register):
+            bfields = self.x__margs[1] if len(self.x__margs) > 1 else {}
+            return _BitFieldBroadcast(self, bfields[name])
+        f_i = self.x__mclass.x__fields[name]
+        bases = [base + f_i[0] for base in self.x__bases]
+        if len(f_i) == 3:
+            return _Broadcast(self.x__iface, bases, f_i[2], f_i[1])
+        return _Broadcast(self.x__iface, bases, f_i[1])
+
+    def _check_register(self):
+        if self.x__nitems is not None or not issubclass(self.x__mclass, _Register):
+            raise Exception("Only registers may be read or written")
+
+    def read(self):
+        """Read the register in all items, returning an array of values."""
+        self._check_register()
+        return _read_multi(self.x__iface, self.x__bases)
+
+    def write(self, value):
+        """Write the register in all items.
+
+        The value may be a single number written to all items,
+        or a sequence with separate value for each item.
+        """
+        self._check_register()
+        if issubclass(self.x__mclass, StatusRegister):
+            raise Exception("Status registers can't be written")
+        if isinstance(value, int):
+            value = len(self.x__bases) * [value]
+        elif len(value) != len(self.x__bases):
+            raise Exception("Wrong number of values for broadcast write")
+        _write_multi(self.x__iface, self.x__bases, value)
+
+
+class _BitFieldBroadcast(object):
+    """Class providing simultaneous access to the same bitfield in many items of a vector."""
+
+    def __init__(self, reg, bf):
+        self.x__reg = reg
+        self.x__bf = bf
+
+    def read(self):
+        """Read the bitfield in all items, returning an array of decoded values."""
+        get = self.x__bf.get
+        tcode = "i" if self.x__bf.sign_mask else "I"
+        return array(tcode, [get(rval) for rval in self.x__reg.read()])
+
+    def write(self, value):
+        """Write the bitfield in all items.
+
+        The value may be a single number written to all items,
+        or a sequence with separate value for each item.
+        As for the single bitfield, the partial-word write (write_sel) is used
+        if possible, then the CLR and SET aliases (for registers with bitops),
+        then the modify method of the interface (for each item).
+        Otherwise, the registers are read in one batch, modified and written
+        back in one batch.
+        """
+        reg = self.x__reg
+        reg._check_register()
+        if issubclass(reg.x__mclass, StatusRegister):
+            raise Exception("Status registers can't be written")
+        iface = reg.x__iface
+        bases = reg.x__bases
+        if isinstance(value, int):
+            value = len(bases) * [value]
+        elif len(value) != len(bases):
+            raise Exception("Wrong number of values for broadcast write")
+        bf = self.x__bf
+        if bf.sel and hasattr(iface, "write_sel"):
+            for base, val in zip(bases, value):
+                iface.write_sel(base, bf.put(0, val), bf.sel)
+            return
+        if issubclass(reg.x__mclass, BitOpsRegister):
+            # Clear and set the bits via aliases, without reading the registers
+            step = reg.x__margs[2]
+            mask = bf.mask
+            vals = [bf.put(0, val) for val in value]
+            # As in the single field, the empty CLR and SET writes are skipped
+            addrs = [base + 2 * step for base, val in zip(bases, vals) if mask & ~val]
+            words = [mask & ~val for val in vals if mask & ~val]
+            addrs += [base + step for base, val in zip(bases, vals) if val]
+            words += [val for val in vals if val]
+            if addrs:
+                _write_multi(iface, addrs, words)
+            return
+        if hasattr(iface, "modify"):
+            for base, val in zip(bases, value):
+                iface.modify(base, bf.mask, bf.put(0, val))
+            return
+        rvals = _read_multi(iface, bases)
+        put = bf.put
+        _write_multi(iface, bases, [put(rval, val) for rval, val in zip(rvals, value)])
 
 
 class Vector(object):
     """Class describing the vector of registers or subblocks.
 
-    It provides only a __getitem__ method that allows to access the particular object
+    The __getitem__ method allows to access the particular object
     in a vector (the object is created on the fly, when it is needed).
+    Indexing with a slice returns a new Vector, covering the selected items.
+    For vectors of registers, all items may be read or written at once
+    with read_all and write_all methods.
+    Accessing an attribute of the vector returns the broadcast object,
+    giving access to that attribute in all items of the vector
+    (e.g. blk.LINKS[:].STATUS.read()).
     """
 
-    def __init__(self, iface, base, nitems, margs):
+    def __init__(self, iface, base, nitems, margs, step=1):
         self.iface = iface
         self.base = base
         self.mclass = margs[0]
-        self.args = None
-        if len(margs) > 1:
-            self.args = margs[1]
+        # Additional arguments of the constructor
+        self.args = tuple(margs[1:])
         self.nitems = nitems
+        # Distance between the consecutive items, in units of the item size
+        self.step = step
+
+    def __len__(self):
+        return self.nitems
+
+    def __iter__(self):
+        for i in range(self.nitems):
+            yield self[i]
 
     def __getitem__(self, key):
-        if key >= self.nitems:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.nitems)
+            n = len(range(start, stop, step))
+            margs = (self.mclass,) + self.args
+            return Vector(
+                self.iface,
+                self.base + start * self.step * self.mclass.x__size,
+                n,
+                margs,
+                step * self.step,
+            )
+        if key < 0:
+            key += self.nitems
+        if key < 0 or key >= self.nitems:
             raise Exception("Access outside the vector")
-        if self.args != None:
-            return self.mclass(
-                self.iface, self.base + key * self.mclass.x__size, self.args
+        adr = self.base + key * self.step * self.mclass.x__size
+        return self.mclass(self.iface, adr, *self.args)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._broadcast(), name)
+
+    def _broadcast(self):
+        """Return the broadcast object covering all items of the vector."""
+        size = self.step * self.mclass.x__size
+        bases = [self.base + i * size for i in range(self.nitems)]
+        margs = (self.mclass,) + self.args
+        return _Broadcast(self.iface, bases, margs)
+
+    def _check_registers(self):
+        if not issubclass(self.mclass, _Register):
+            raise Exception("Bulk access is only possible for vectors of registers")
+
+    def read_all(self):
+        """Read all registers in the vector.
+
+        Contiguous vectors are read with a single block transfer.
+        The values are returned as a compact array of words.
+        """
+        self._check_registers()
+        if self.step == 1:
+            return _read_block(self.iface, self.base, self.nitems)
+        return _words([self.iface.read(self.base + i * self.step) for i in range(self.nitems)])
+
+    def iter_all(self, chunk=FIFO_CHUNK, prefetch=False):
+        """Read all registers in the vector, chunk by chunk.
+
+        Yields memoryviews of reusable buffers with up to chunk words,
+        like _Register.iter_fifo. Contiguous vectors are read with block transfers.
+        """
+        self._check_registers()
+        if self.step == 1:
+
+            def read(first, count):
+                return _read_block(self.iface, self.base + first, count)
+
+        else:
+
+            def read(first, count):
+                start = self.base + first * self.step
+                return _read_multi(
+                    self.iface, range(start, start + count * self.step, self.step)
+                )
+
+        return _iter_chunks(read, self.nitems, chunk, prefetch)
+
+    def write_all(self, values):
+        """Write all registers in the vector with values from the sequence."""
+        self._check_registers()
+        if len(values) != self.nitems:
+            raise Exception(
+                "Wrong number of values: " + str(len(values)) + ", expected " + str(self.nitems)
             )
-        return self.mclass(self.iface, self.base + key * self.mclass.x__size)
+        if issubclass(self.mclass, StatusRegister):
+            raise Exception("Status registers at " + hex(self.base) + " can't be written")
+        if self.step == 1:
+            _write_block(self.iface, self.base, values)
+        else:
+            for i, val in enumerate(values):
+                self.iface.write(self.base + i * self.step, val)
 
 
 class Block(object):
@@ -117,6 +697,7 @@ class Block(object):
     x__is_blackbox = False
     x__size = 1
     x__fields = {}
+    x__snapshots = {}
 
     def __init__(self, iface, base):
         """base is the base address for the given block. """
@@ -131,41 +712,245 @@ class Block(object):
         if len(f_i) == 3:
             return Vector(self.x__iface, self.x__base + f_i[0], f_i[1], f_i[2])
         elif len(f_i) == 2:
-            if len(f_i[1]) == 1:
-                return f_i[1][0](self.x__iface, self.x__base + f_i[0])
-            # pass addititional argument to the constructor
-            return f_i[1][0](self.x__iface, self.x__base + f_i[0], f_i[1][1])
-
-    def _verify_id(self):
-        id = self.ID.read()
-        if id != self.x__id:
-            raise Exception(
-                self.__class__.__name__ + " has ID " + hex(self.x__id) + ", read ID " + hex(id)
-            )
+            # pass addititional arguments to the constructor
+            return f_i[1][0](self.x__iface, self.x__base + f_i[0], *f_i[1][1:])
 
-    def _verify_ver(self):
-        ver = self.VER.read()
-        if ver != self.x__ver:
-            raise Exception(
-                self.__class__.__name__ + " has VER " + hex(self.x__ver) + ", read VER " + hex(ver)
-            )
+    @classmethod
+    def _iter_blocks(cls, base, path=""):
+        """Yield (path, class, base) for this block and all its subblocks.
+
+        Elements of vectors of subblocks are yielded separately.
+        """
+        yield path, cls, base
+        if path:
+            path += "."
+        for name, f_i in cls.x__fields.items():
+            if len(f_i) == 3:
+                mclass = f_i[2][0]
+                if issubclass(mclass, Block):
+                    for i in range(f_i[1]):
+                        yield from mclass._iter_blocks(
+                            base + f_i[0] + i * mclass.x__size,
+                            path + name + "[" + str(i) + "]",
+                        )
+            elif issubclass(f_i[1][0], Block):
+                yield from f_i[1][0]._iter_blocks(base + f_i[0], path + name)
 
-    def verify_id_and_version(self):
+    def verify_id_and_version(self, cache=False):
         """Read and verify id (ID) and version (VER) registers values.
 
         This function reads and verifies ID and VER register values
-        in a recursive way for all non black box blocks.
+        in a recursive way for all non black box blocks (including
+        all elements of vectors of subblocks).
+        All registers are read in a single batch.
         It raises the exception if read values differ as it indicates,
         that software and firmware versions differ.
+        The exception lists all detected mismatches.
+        If cache is True, the successful verification is remembered
+        for the session (for the given interface, base address and version),
+        and the next calls return immediately. The registers are not read
+        again then, so a later change of ID or VER (e.g. after reloading
+        the firmware) is not detected, unless clear_verified is called.
+        Interfaces that don't support weak references are never cached.
+        """
+        key = (self.x__base, type(self), self.x__ver)
+        if cache:
+            try:
+                verified = _verified.setdefault(self.x__iface, set())
+            except TypeError:
+                # The interface can't be referenced weakly
+                cache = False
+            else:
+                if key in verified:
+                    return
+        checks = []
+        for path, cls, base in self._iter_blocks(self.x__base, type(self).__name__):
+            if cls.x__is_blackbox:
+                continue
+            checks.append((path, "ID", base + cls.x__fields["ID"][0], cls.x__id))
+            checks.append((path, "VER", base + cls.x__fields["VER"][0], cls.x__ver))
+        vals = _read_multi(self.x__iface, [chk[2] for chk in checks])
+        errors = []
+        for (path, reg, adr, expected), val in zip(checks, vals):
+            if val != expected:
+                errors.append(
+                    path + " has " + reg + " " + hex(expected) + ", read " + reg + " " + hex(val)
+                )
+        if errors:
+            raise Exception("\n".join(errors))
+        if cache:
+            verified.add(key)
+
+    def _iter_registers(self):
+        """Yield (path, address, is_writable) for all registers in the hierarchy.
+
+        Blackboxes and FIFO ports are skipped.
+        """
+        for path, cls, base in self._iter_blocks(self.x__base):
+            if cls.x__is_blackbox:
+                continue
+            if path:
+                path += "."
+            for name, f_i in cls.x__fields.items():
+                mclass = f_i[-1][0]
+                # Reading the FIFO port would consume the data
+                if not issubclass(mclass, _Register) or issubclass(mclass, FifoRegister):
+                    continue
+                writable = not issubclass(mclass, StatusRegister)
+                if len(f_i) == 3:
+                    for i in range(f_i[1]):
+                        yield path + name + "[" + str(i) + "]", base + f_i[0] + i, writable
+                else:
+                    yield path + name, base + f_i[0], writable
+
+    def snapshot(self):
+        """Read all registers in the hierarchy and return them as a Snapshot.
+
+        The addresses are coalesced into contiguous ranges,
+        and each range is read with a single block transfer.
+        """
+        regs = sorted(self._iter_registers(), key=lambda reg: reg[1])
+        addrs = array("I", [reg[1] for reg in regs])
+        values = []
+        for first, adr, count in _ranges(addrs):
+            values.extend(_read_block(self.x__iface, adr, count))
+        return Snapshot(
+            [reg[0] for reg in regs], _words(values), array("B", [reg[2] for reg in regs])
+        )
+
+    def restore(self, snap):
+        """Write back the control registers stored in the Snapshot snap.
+
+        The registers are identified by their paths, so the snapshot
+        may be restored even if addresses have changed.
+        The registers are written in the order of addresses,
+        each contiguous range with a single block transfer.
         """
-        for k in self.x__fields.keys():
-            subblock = getattr(self, k)
-            if not issubclass(type(subblock), Block):
+        addrs = {}
+        for path, adr, writable in self._iter_registers():
+            if writable:
+                addrs[path] = adr
+        data = []
+        for path, value, writable in zip(snap.paths, snap.values, snap.writable):
+            if not writable:
                 continue
+            if path not in addrs:
+                raise Exception("Control register " + path + " not found in " + type(self).__name__)
+            data.append((addrs[path], value))
+        data.sort()
+        for first, adr, count in _ranges([dat[0] for dat in data]):
+            _write_block(
+                self.x__iface, adr, _words([dat[1] for dat in data[first : first + count]])
+            )
+
+    def read_group(self, name):
+        """Read all registers of the snapshot group name in a single batch.
 
-        if self.x__is_blackbox == False:
-            self._verify_id()
-            self._verify_ver()
+        The first register of the group is read first, which latches
+        the whole group in the firmware, so all values are consistent.
+        Returns the dictionary with values of registers
+        (arrays of values for vectors of registers).
+        """
+        addrs = []
+        counts = []
+        for reg in self.x__snapshots[name]:
+            f_i = self.x__fields[reg]
+            count = f_i[1] if len(f_i) == 3 else 1
+            addrs.extend(range(self.x__base + f_i[0], self.x__base + f_i[0] + count))
+            counts.append((reg, count, len(f_i) == 3))
+        values = _read_multi(self.x__iface, addrs)
+        res = {}
+        pos = 0
+        for reg, count, is_vector in counts:
+            if is_vector:
+                res[reg] = values[pos : pos + count]
+            else:
+                res[reg] = values[pos]
+            pos += count
+        return res
+
+
+class BlackBox(Block):
+    """Base class for the generated classes of blackboxes.
+
+    Besides the access to single words (as the vector of registers "reg"),
+    it provides the bulk transfers to and from the blackbox area.
+    """
+
+    x__is_blackbox = True
+
+    def _check(self, offset, count):
+        if offset < 0 or count < 0 or offset + count > self.x__size:
+            raise Exception("Access outside the blackbox at " + hex(self.x__base))
+
+    def read_block(self, offset, n, out=None):
+        """Read n words starting at offset.
+
+        The block transfer of the interface is used if available.
+        If out is given, the words are copied into that preallocated
+        buffer-protocol object (e.g. array, bytearray or NumPy array),
+        and it is returned. Otherwise the compact array of words
+        (or the buffer returned by the interface) is returned.
+        """
+        self._check(offset, n)
+        data = _read_block(self.x__iface, self.x__base + offset, n)
+        if out is None:
+            return data
+        src = memoryview(data).cast("B")
+        dst = memoryview(out).cast("B")
+        if dst.nbytes < src.nbytes:
+            raise Exception(
+                "Buffer too small: " + str(dst.nbytes) + " bytes, needed " + str(src.nbytes)
+            )
+        dst[: src.nbytes] = src
+        return out
+
+    def write_block(self, offset, buffer):
+        """Write the words from buffer to consecutive addresses starting at offset.
+
+        The buffer may be any buffer-protocol object (see _as_words) or a sequence.
+        """
+        values = _as_words(buffer)
+        self._check(offset, len(values))
+        _write_block(self.x__iface, self.x__base + offset, values)
+
+
+class Snapshot(object):
+    """Class storing the state of all registers in the hierarchy.
+
+    It contains the list of register paths (relative to the block),
+    the array of their values, and the array of flags marking
+    the writable (control) registers.
+    """
+
+    def __init__(self, paths, values, writable):
+        self.paths = paths
+        self.values = values
+        self.writable = writable
+
+    def __getitem__(self, path):
+        return self.values[self.paths.index(path)]
+
+    def save(self, fname):
+        """Save the snapshot to the compressed NumPy (.npz) file."""
+        _need_numpy()
+        numpy.savez_compressed(
+            fname,
+            paths=numpy.array(self.paths),
+            values=numpy.asarray(self.values),
+            writable=numpy.frombuffer(self.writable, dtype=numpy.uint8),
+        )
+
+    @classmethod
+    def load(cls, fname):
+        """Load the snapshot from the file created with save."""
+        _need_numpy()
+        with numpy.load(fname) as dat:
+            return cls(
+                [str(path) for path in dat["paths"]],
+                _words(dat["values"].tolist()),
+                array("B", dat["writable"].tobytes()),
+            )
 
 
 class _Register(object):
@@ -184,14 +969,67 @@ class _Register(object):
     def read(self):
         return self.x__iface.read(self.x__base)
 
-    def read_fifo(self, count):
-        return self.x__iface.read_fifo(self.x__base, count)
+    def read_fifo(self, count, chunk=FIFO_CHUNK):
+        """Read count words from the register used as the FIFO port.
+
+        The data are transferred in bursts of up to chunk words.
+        """
+        res = array("I")
+        for first in range(0, count, chunk):
+            part = _read_fifo(self.x__iface, self.x__base, min(chunk, count - first))
+            try:
+                res.extend(part)
+            except (TypeError, OverflowError):
+                # Words wider than 32 bits
+                res = array("Q", res)
+                res.extend(part)
+        return res
 
     def write(self, value):
         self.x__iface.write(self.x__base, value)
 
-    def write_fifo(self, values):
-        self.x__iface.write(self.x__base, values)
+    def iter_fifo(self, total, chunk=FIFO_CHUNK, prefetch=False):
+        """Read total words from the register used as the FIFO port, chunk by chunk.
+
+        Yields memoryviews of reusable buffers with up to chunk words
+        (see _iter_chunks), so the memory use doesn't depend on total.
+        The view may be wrapped without copying with numpy.frombuffer,
+        or written to the file directly. It is valid until the next
+        chunk is requested, so it must be copied if it should be kept.
+        If prefetch is True, the next chunk is read while the current one
+        is processed. Note that when the iteration is finished early,
+        the prefetched chunk is lost.
+        """
+        return _iter_chunks(
+            lambda first, count: _read_fifo(self.x__iface, self.x__base, count),
+            total,
+            chunk,
+            prefetch,
+        )
+
+    def write_fifo(self, values, chunk=FIFO_CHUNK):
+        """Write values to the register used as the FIFO port.
+
+        The data are transferred in bursts of up to chunk words.
+        """
+        for first in range(0, len(values), chunk):
+            _write_fifo(self.x__iface, self.x__base, values[first : first + chunk])
+
+    def decode_fields(self, data):
+        """Decode all bitfields from the register values in data.
+
+        Returns the NumPy structured array with one named field per bitfield.
+        """
+        _need_numpy()
+        data = numpy.asarray(data)
+        dtype = [
+            (name, numpy.int64 if bf.sign_mask else bf.dtype())
+            for name, bf in self.x__bfields.items()
+        ]
+        res = numpy.empty(data.shape, dtype=dtype)
+        for name, bf in self.x__bfields.items():
+            res[name] = bf.decode(data)
+        return res
 
     def __getattr__(self, name):
         return _BitFieldAccess(self.x__iface, self.x__base, self.x__bfields[name])
@@ -200,6 +1038,34 @@ class _Register(object):
 ControlRegister = _Register  # The control register is just the generic register
 
 
+class BitOpsRegister(_Register):
+    """Class supporting access to the control register with SET/CLR/TOGGLE aliases.
+
+    The aliases are placed at alias_step, 2*alias_step and 3*alias_step
+    after the register (alias_step is the number of registers in the vector).
+    The bits set in the value written to the alias are set, cleared or toggled
+    in the register, so bitfields are written without the read-modify-write sequence.
+    """
+
+    def __init__(self, iface, base, bfields={}, alias_step=1):
+        _Register.__init__(self, iface, base, bfields)
+        self.x__alias_step = alias_step
+
+    def set_bits(self, mask):
+        self.x__iface.write(self.x__base + self.x__alias_step, mask)
+
+    def clear_bits(self, mask):
+        self.x__iface.write(self.x__base + 2 * self.x__alias_step, mask)
+
+    def toggle_bits(self, mask):
+        self.x__iface.write(self.x__base + 3 * self.x__alias_step, mask)
+
+    def __getattr__(self, name):
+        return _BitOpsFieldAccess(
+            self.x__iface, self.x__base, self.x__bfields[name], self.x__alias_step
+        )
+
+
 class StatusRegister(_Register):
     """Class supporting access to the read-only (status) register.
 
@@ -210,6 +1076,130 @@ class StatusRegister(_Register):
         raise Exception("Status register at " + hex(self.x__base) + " can't be written")
 
 
+class Memory(object):
+    """Class supporting access to the memory area of depth words.
+
+    Indexing with an integer reads or writes the single word,
+    and indexing with a slice (with step 1) uses the block transfer.
+    The block reads return the compact array of words (or the buffer
+    returned directly by the interface, e.g. the memoryview of the mapped
+    memory), which may be wrapped with numpy.frombuffer without copying.
+    """
+
+    def __init__(self, iface, base, depth):
+        self.x__iface = iface
+        self.x__base = base
+        self.x__depth = depth
+
+    def __len__(self):
+        return self.x__depth
+
+    def _check(self, offset, count):
+        if offset < 0 or count < 0 or offset + count > self.x__depth:
+            raise Exception("Access outside the memory at " + hex(self.x__base))
+
+    def read(self, offset):
+        self._check(offset, 1)
+        return self.x__iface.read(self.x__base + offset)
+
+    def write(self, offset, value):
+        self._check(offset, 1)
+        self.x__iface.write(self.x__base + offset, value)
+
+    def read_block(self, offset=0, count=None):
+        """Read count words starting at offset (by default up to the end of the memory)."""
+        if count is None:
+            count = self.x__depth - offset
+        self._check(offset, count)
+        return _read_block(self.x__iface, self.x__base + offset, count)
+
+    def write_block(self, offset, values):
+        """Write values to consecutive words starting at offset."""
+        self._check(offset, len(values))
+        _write_block(self.x__iface, self.x__base + offset, values)
+
+    def iter_block(self, offset=0, count=None, chunk=FIFO_CHUNK, prefetch=False):
+        """Read count words starting at offset, chunk by chunk (see _Register.iter_fifo)."""
+        if count is None:
+            count = self.x__depth - offset
+        self._check(offset, count)
+        return _iter_chunks(
+            lambda first, n: _read_block(self.x__iface, self.x__base + offset + first, n),
+            count,
+            chunk,
+            prefetch,
+        )
+
+    def _slice(self, key):
+        start, stop, step = key.indices(self.x__depth)
+        if step != 1:
+            raise Exception("Only slices with step 1 are supported")
+        return start, max(stop - start, 0)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.read_block(*self._slice(key))
+        if key < 0:
+            key += self.x__depth
+        return self.read(key)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            start, count = self._slice(key)
+            if len(value) != count:
+                raise Exception(
+                    "Wrong number of values: " + str(len(value)) + ", expected " + str(count)
+                )
+            self.write_block(start, value)
+            return
+        if key < 0:
+            key += self.x__depth
+        self.write(key, value)
+
+
+class FifoRegister(_Register):
+    """Class supporting access to the FIFO port.
+
+    is_read selects the read FIFO (that can't be written)
+    or the write FIFO (that can't be read).
+    The generated firmware inserts wait states when the FIFO is empty
+    (read) or full (write), so the data may be streamed without checking
+    the FIFO state.
+    """
+
+    def __init__(self, iface, base, bfields={}, is_read=True):
+        _Register.__init__(self, iface, base, bfields)
+        self.x__is_read = is_read
+
+    def _check_read(self):
+        if not self.x__is_read:
+            raise Exception("Write FIFO at " + hex(self.x__base) + " can't be read")
+
+    def _check_write(self):
+        if self.x__is_read:
+            raise Exception("Read FIFO at " + hex(self.x__base) + " can't be written")
+
+    def read(self):
+        self._check_read()
+        return _Register.read(self)
+
+    def read_fifo(self, count, chunk=FIFO_CHUNK):
+        self._check_read()
+        return _Register.read_fifo(self, count, chunk)
+
+    def iter_fifo(self, total, chunk=FIFO_CHUNK, prefetch=False):
+        self._check_read()
+        return _Register.iter_fifo(self, total, chunk, prefetch)
+
+    def write(self, value):
+        self._check_write()
+        _Register.write(self, value)
+
+    def write_fifo(self, values, chunk=FIFO_CHUNK):
+        self._check_write()
+        _Register.write_fifo(self, values, chunk)
+
+
 """
 Below is the demo code, showing an example how we may access the registers
 via an emulated interface.
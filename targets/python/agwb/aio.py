@@ -0,0 +1,478 @@
+#!/usr/bin/python3
+"""@package docstring
+Documentation for aio.py module
+
+The aio.py module provides the asyncio variant of the access
+to hierarchy of blocks/registers/bitfields generated by addr_gen_wb.
+It reuses the classes generated for the synchronous agwb.py module
+(their x__fields describe the hierarchy), but all accesses are
+performed via coroutines, so many transactions may be outstanding
+at the same time (e.g. with asyncio.gather over boards or vector items).
+
+The interface must provide two coroutine methods:
+
+async read(self,address) that returns 32-bit value
+async write(self,address,value) that writes such a value
+
+Optionally, it may also provide coroutines read_block, write_block,
+read_multi, write_multi, read_fifo, write_fifo, modify and write_sel
+with the same semantics as described in the agwb.py module.
+
+Example:
+    top = aio.Block(MAIN, iface, 0)
+    await top.LINKS[3].CTRL.START.write(1)
+    vals = await asyncio.gather(*(l.STATUS.read() for l in top.LINKS))
+"""
+import asyncio
+from array import array
+from . import agwb
+
+
+async def _read_block(iface, base, count):
+    """Read count consecutive words starting at base."""
+    if count == 0:
+        return array("I")
+    if hasattr(iface, "read_block"):
+        res = await iface.read_block(base, count)
+        if isinstance(res, list):
+            res = agwb._words(res)
+        return res
+    res = await asyncio.gather(*(iface.read(base + i) for i in range(count)))
+    return agwb._words(res)
+
+
+async def _write_block(iface, base, values):
+    """Write values to consecutive addresses starting at base."""
+    if len(values) == 0:
+        return
+    if hasattr(iface, "write_block"):
+        await iface.write_block(base, values)
+        return
+    await asyncio.gather(*(iface.write(base + i, val) for i, val in enumerate(values)))
+
+
+async def _read_multi(iface, addrs):
+    """Read the words from addrs, in a single batch if possible."""
+    if hasattr(iface, "read_multi"):
+        res = await iface.read_multi(addrs)
+        if isinstance(res, list):
+            res = agwb._words(res)
+        return res
+    res = await asyncio.gather(*(iface.read(adr) for adr in addrs))
+    return agwb._words(res)
+
+
+async def _read_fifo(iface, address, count):
+    """Read count words from the FIFO port at address (see agwb._read_fifo)."""
+    if count == 0:
+        return array("I")
+    if hasattr(iface, "read_fifo"):
+        res = await iface.read_fifo(address, count)
+        if isinstance(res, list):
+            res = agwb._words(res)
+        return res
+    # The words must be read in order
+    res = []
+    for i in range(count):
+        res.append(await iface.read(address))
+    return agwb._words(res)
+
+
+async def _write_fifo(iface, address, values):
+    """Write values to the FIFO port at address (see agwb._write_fifo)."""
+    if len(values) == 0:
+        return
+    if hasattr(iface, "write_fifo"):
+        await iface.write_fifo(address, values)
+        return
+    for val in values:
+        await iface.write(address, val)
+
+
+class _BitFieldAccess(object):
+    """Class providing the asynchronous read/write access to the bitfield.
+
+    The write is dispatched like in the synchronous module: the partial-word
+    write (write_sel) if possible, then the CLR and SET aliases (if alias_step
+    is given), then the modify method of the interface, and finally
+    the read-modify-write sequence.
+    """
+
+    def __init__(self, reg, bf, alias_step=None):
+        self.x__reg = reg
+        self.x__iface = reg.x__iface
+        self.x__base = reg.x__base
+        self.x__bf = bf
+        self.x__alias_step = alias_step
+
+    async def read(self):
+        return self.x__bf.get(await self.x__reg.read())
+
+    async def write(self, value):
+        self.x__reg._check_write()
+        val = self.x__bf.put(0, value)
+        if self.x__bf.sel and hasattr(self.x__iface, "write_sel"):
+            await self.x__iface.write_sel(self.x__base, val, self.x__bf.sel)
+            return
+        if self.x__alias_step is not None:
+            clr = self.x__bf.mask & ~val
+            if clr:
+                await self.x__iface.write(self.x__base + 2 * self.x__alias_step, clr)
+            if val:
+                await self.x__iface.write(self.x__base + self.x__alias_step, val)
+            return
+        if hasattr(self.x__iface, "modify"):
+            await self.x__iface.modify(self.x__base, self.x__bf.mask, val)
+            return
+        rval = await self.x__reg.read()
+        await self.x__iface.write(self.x__base, self.x__bf.put(rval, value))
+
+
+class Register(object):
+    """Class supporting the asynchronous access to the register.
+
+    rclass is the register class used by the synchronous module
+    (agwb.ControlRegister, agwb.StatusRegister, agwb.BitOpsRegister
+    or agwb.FifoRegister), and args are its additional arguments
+    (alias_step or is_read).
+    """
+
+    x__size = 1
+
+    def __init__(self, iface, base, rclass, bfields={}, *args):
+        self.x__iface = iface
+        self.x__base = base
+        self.x__rclass = rclass
+        self.x__bfields = bfields
+        self.x__alias_step = None
+        self.x__is_read = None
+        if issubclass(rclass, agwb.BitOpsRegister):
+            self.x__alias_step = args[0] if args else 1
+        elif issubclass(rclass, agwb.FifoRegister):
+            self.x__is_read = args[0] if args else True
+
+    def __dir__(self):
+        return self.x__bfields.keys()
+
+    def _check_read(self):
+        if self.x__is_read is False:
+            raise Exception("Write FIFO at " + hex(self.x__base) + " can't be read")
+
+    def _check_write(self):
+        if issubclass(self.x__rclass, agwb.StatusRegister):
+            raise Exception("Status register at " + hex(self.x__base) + " can't be written")
+        if self.x__is_read:
+            raise Exception("Read FIFO at " + hex(self.x__base) + " can't be written")
+
+    def _check_aliases(self):
+        if self.x__alias_step is None:
+            raise Exception("Register at " + hex(self.x__base) + " has no bitops aliases")
+
+    async def read(self):
+        self._check_read()
+        return await self.x__iface.read(self.x__base)
+
+    async def write(self, value):
+        self._check_write()
+        await self.x__iface.write(self.x__base, value)
+
+    async def read_fifo(self, count):
+        """Read count words from the register used as the FIFO port."""
+        self._check_read()
+        return await _read_fifo(self.x__iface, self.x__base, count)
+
+    async def write_fifo(self, values):
+        """Write values to the register used as the FIFO port."""
+        self._check_write()
+        await _write_fifo(self.x__iface, self.x__base, values)
+
+    async def set_bits(self, mask):
+        self._check_aliases()
+        await self.x__iface.write(self.x__base + self.x__alias_step, mask)
+
+    async def clear_bits(self, mask):
+        self._check_aliases()
+        await self.x__iface.write(self.x__base + 2 * self.x__alias_step, mask)
+
+    async def toggle_bits(self, mask):
+        self._check_aliases()
+        await self.x__iface.write(self.x__base + 3 * self.x__alias_step, mask)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _BitFieldAccess(self, self.x__bfields[name], self.x__alias_step)
+
+
+class Memory(object):
+    """Class supporting the asynchronous access to the memory area."""
+
+    def __init__(self, iface, base, depth):
+        self.x__iface = iface
+        self.x__base = base
+        self.x__depth = depth
+
+    def __len__(self):
+        return self.x__depth
+
+    def _check(self, offset, count):
+        if offset < 0 or count < 0 or offset + count > self.x__depth:
+            raise Exception("Access outside the memory at " + hex(self.x__base))
+
+    async def read(self, offset):
+        self._check(offset, 1)
+        return await self.x__iface.read(self.x__base + offset)
+
+    async def write(self, offset, value):
+        self._check(offset, 1)
+        await self.x__iface.write(self.x__base + offset, value)
+
+    async def read_block(self, offset=0, count=None):
+        if count is None:
+            count = self.x__depth - offset
+        self._check(offset, count)
+        return await _read_block(self.x__iface, self.x__base + offset, count)
+
+    async def write_block(self, offset, values):
+        self._check(offset, len(values))
+        await _write_block(self.x__iface, self.x__base + offset, values)
+
+
+def _make(iface, base, margs):
+    """Create the asynchronous access object for the class described by margs."""
+    mclass = margs[0]
+    if issubclass(mclass, agwb.Memory):
+        return Memory(iface, base, *margs[1:])
+    if issubclass(mclass, agwb._Register):
+        return Register(iface, base, mclass, *margs[1:])
+    return Block(mclass, iface, base)
+
+
+class Vector(object):
+    """Class describing the vector of registers or subblocks.
+
+    Items are created on the fly, when they are needed.
+    The vector may be sliced and iterated like in the synchronous module.
+    """
+
+    def __init__(self, iface, base, nitems, margs, step=1):
+        self.iface = iface
+        self.base = base
+        self.margs = margs
+        self.nitems = nitems
+        self.step = step
+
+    def __len__(self):
+        return self.nitems
+
+    def __iter__(self):
+        for i in range(self.nitems):
+            yield self[i]
+
+    def __getitem__(self, key):
+        size = self.margs[0].x__size
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.nitems)
+            return Vector(
+                self.iface,
+                self.base + start * self.step * size,
+                len(range(start, stop, step)),
+                self.margs,
+                step * self.step,
+            )
+        if key < 0:
+            key += self.nitems
+        if key < 0 or key >= self.nitems:
+            raise Exception("Access outside the vector")
+        return _make(self.iface, self.base + key * self.step * size, self.margs)
+
+    def _check_registers(self):
+        if not issubclass(self.margs[0], agwb._Register):
+            raise Exception("Bulk access is only possible for vectors of registers")
+
+    async def read_all(self):
+        """Read all registers in the vector, returning an array of values."""
+        self._check_registers()
+        if self.step == 1:
+            return await _read_block(self.iface, self.base, self.nitems)
+        res = await asyncio.gather(*(item.read() for item in self))
+        return agwb._words(res)
+
+    async def write_all(self, values):
+        """Write all registers in the vector with values from the sequence."""
+        self._check_registers()
+        if len(values) != self.nitems:
+            raise Exception(
+                "Wrong number of values: " + str(len(values)) + ", expected " + str(self.nitems)
+            )
+        if issubclass(self.margs[0], agwb.StatusRegister):
+            raise Exception("Status registers at " + hex(self.base) + " can't be written")
+        if self.step == 1:
+            await _write_block(self.iface, self.base, values)
+        else:
+            await asyncio.gather(*(item.write(val) for item, val in zip(self, values)))
+
+
+class Block(object):
+    """Class supporting the asynchronous access to the block.
+
+    bclass is the block class generated for the synchronous module.
+    """
+
+    def __init__(self, bclass, iface, base):
+        self.x__bclass = bclass
+        self.x__iface = iface
+        self.x__base = base
+
+    def __dir__(self):
+        return self.x__bclass.x__fields.keys()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        f_i = self.x__bclass.x__fields[name]
+        if len(f_i) == 3:
+            return Vector(self.x__iface, self.x__base + f_i[0], f_i[1], f_i[2])
+        return _make(self.x__iface, self.x__base + f_i[0], f_i[1])
+
+    async def verify_id_and_version(self):
+        """Read and verify id (ID) and version (VER) registers values.
+
+        Like in the synchronous module, the registers of the block and all
+        its subblocks (except black boxes) are checked, and they are read
+        in a single batch (or concurrently).
+        It raises the exception listing all detected mismatches.
+        """
+        bclass = self.x__bclass
+        checks = []
+        for path, cls, base in bclass._iter_blocks(self.x__base, bclass.__name__):
+            if cls.x__is_blackbox:
+                continue
+            checks.append((path, "ID", base + cls.x__fields["ID"][0], cls.x__id))
+            checks.append((path, "VER", base + cls.x__fields["VER"][0], cls.x__ver))
+        if not checks:
+            return
+        vals = await _read_multi(self.x__iface, [chk[2] for chk in checks])
+        errors = []
+        for (path, reg, adr, expected), val in zip(checks, vals):
+            if val != expected:
+                errors.append(
+                    path + " has " + reg + " " + hex(expected) + ", read " + reg + " " + hex(val)
+                )
+        if errors:
+            raise Exception("\n".join(errors))
+
+
+"""
+Below is the demo code and the benchmark, comparing sequential and concurrent
+access to several emulated boards via a local asyncio TCP mock server.
+Each request is a 9-byte frame (command, address, data), each response
+is a 4-byte word. The server adds a fixed latency to each transaction.
+"""
+if __name__ == "__main__":
+    import struct
+    import time
+
+    LATENCY = 0.001
+    NBOARDS = 8
+
+    class c2(agwb.Block):
+        x__size = 4
+        x__id = 0x1234
+        x__ver = 0x5678
+        x__fields = {
+            "ID": (0, (agwb.StatusRegister,)),
+            "VER": (1, (agwb.StatusRegister,)),
+            "STATUS": (2, (agwb.StatusRegister,)),
+            "CTRL": (3, (agwb.ControlRegister, {"START": agwb.BitField(0, 0, False)})),
+        }
+
+    class c1(agwb.Block):
+        x__size = 256
+        x__fields = {"LINKS": (0, 32, (c2,))}
+
+    async def respond(writer, val, prev):
+        await asyncio.sleep(LATENCY)
+        # Responses must be sent in the order of requests
+        if prev is not None:
+            await prev
+        writer.write(struct.pack("<I", val))
+
+    async def handle_client(reader, writer):
+        rf = {}
+        for i in range(32):
+            rf[4 * i] = 0x1234
+            rf[4 * i + 1] = 0x5678
+        prev = None
+        while True:
+            try:
+                frame = await reader.readexactly(9)
+            except asyncio.IncompleteReadError:
+                break
+            cmd, adr, val = struct.unpack("<BII", frame)
+            if cmd == 1:
+                rf[adr] = val
+            else:
+                val = rf.get(adr, 0)
+            # The next request is accepted before the response is sent
+            prev = asyncio.ensure_future(respond(writer, val, prev))
+        writer.close()
+
+    class AsyncIface(object):
+        """Pipelined TCP interface - responses arrive in the order of requests."""
+
+        def __init__(self, reader, writer):
+            self.reader = reader
+            self.writer = writer
+            self.last = None
+
+        async def _transact(self, cmd, adr, val):
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            prev = self.last
+            self.last = fut
+            self.writer.write(struct.pack("<BII", cmd, adr, val))
+            try:
+                if prev is not None:
+                    await prev
+                data = await self.reader.readexactly(4)
+            finally:
+                fut.set_result(None)
+            return struct.unpack("<I", data)[0]
+
+        async def read(self, adr):
+            return await self._transact(0, adr, 0)
+
+        async def write(self, adr, val):
+            await self._transact(1, adr, val)
+
+    async def main():
+        server = await asyncio.start_server(handle_client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        boards = []
+        writers = []
+        for i in range(NBOARDS):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writers.append(writer)
+            boards.append(Block(c1, AsyncIface(reader, writer), 0))
+        await boards[0].LINKS[0].verify_id_and_version()
+        await boards[0].LINKS[1].CTRL.START.write(1)
+        print("CTRL:", await boards[0].LINKS[1].CTRL.read())
+        t0 = time.time()
+        for b in boards:
+            for link in b.LINKS:
+                await link.STATUS.read()
+        t1 = time.time()
+        await asyncio.gather(*(link.STATUS.read() for b in boards for link in b.LINKS))
+        t2 = time.time()
+        ntrans = NBOARDS * 32
+        print("sequential: %.1f transactions/s" % (ntrans / (t1 - t0)))
+        print("concurrent: %.1f transactions/s" % (ntrans / (t2 - t1)))
+        for writer in writers:
+            writer.close()
+            await writer.wait_closed()
+        await asyncio.sleep(LATENCY)
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/python3
+"""@package docstring
+Documentation for emul.py module
+
+The emul.py module provides the in-process emulator of the register file
+described by the sysdef. It implements the agwb interface (read/write and the
+optional block and batched transfers) in memory, so the software may be tested
+without the HDL simulation.
+
+The structure of the emulated system is described by the classes generated
+by addr_gen_wb in the <top>_emul.py file (derived from BlockDesc).
+The emulator behaves like the generated VHDL code:
+* ID and VER registers return the block ID and version
+  (they are described as status registers with default values),
+* control registers are initialized with their default values,
+  and store only the bits fitting in the register width,
+* writes to status registers are ignored,
+* writes to SET/CLR/TOGGLE aliases set, clear or toggle the bits
+  of the control register (reads of aliases return its value),
+* reading the first register of a snapshot group latches the whole group,
+  and other registers of the group return the latched values,
+* FIFO ports are emulated with queues (see the fifo method); as the emulator
+  can't insert wait states, reading the empty FIFO raises BusError,
+  and so does the access in the wrong direction,
+* accesses to unmapped addresses raise BusError.
+Memory areas are emulated with the Memory objects (see the memories field).
+Blackboxes are unmapped unless the handler is attached to them
+with the attach method. The handler must provide read(offset)
+and write(offset,value) methods (e.g. the Memory object below).
+"""
+from array import array
+from collections import deque
+from .agwb import BusError, _sel_mask, _words
+
+
+class BlockDesc(object):
+    """Base class for the generated descriptions of blocks.
+
+    x__regs contains tuples (address, name, reps, is_vector, is_writable, default, mask)
+    (including ID and VER registers)
+    x__subblocks contains tuples (address, name, reps, is_vector, block description)
+    x__blackboxes contains tuples (address, name, reps, is_vector, size)
+    x__bitops contains tuples (address, reps) of registers with SET/CLR/TOGGLE aliases
+    x__snapshots contains tuples of (address, reps) of registers in each snapshot group
+    (the first one latches the group)
+    x__fifos contains tuples in the same format as x__regs, describing FIFO ports
+    (is_writable is True for the write FIFO)
+    x__memories contains tuples (address, name, depth, width) of memory areas
+    All addresses are relative to the base of the block.
+    """
+
+    x__size = 1
+    x__id = 0
+    x__ver = 0
+    x__regs = ()
+    x__subblocks = ()
+    x__blackboxes = ()
+    x__bitops = ()
+    x__snapshots = ()
+    x__fifos = ()
+    x__memories = ()
+
+
+def _item_name(path, name, i, is_vector):
+    if is_vector:
+        name += "[" + str(i) + "]"
+    if path:
+        return path + "." + name
+    return name
+
+
+class Memory(object):
+    """Simple handler emulating the RAM, that may be attached to the blackbox.
+
+    It is also used to emulate the memory areas.
+    """
+
+    def __init__(self, size, width=32):
+        self.data = array("I" if width <= 32 else "Q", size * [0])
+        self.mask = (1 << width) - 1
+
+    def read(self, offset):
+        return self.data[offset]
+
+    def write(self, offset, value):
+        self.data[offset] = value & self.mask
+
+
+class Emulator(object):
+    """In-memory emulator of the register file.
+
+    desc is the generated description of the top block,
+    base is the address of the top block.
+    Registers may be accessed by their paths with emul[path] and emul[path] = value
+    (also the status registers, which can't be written via the bus).
+    """
+
+    def __init__(self, desc, base=0):
+        # Current values of all registers
+        self.mem = {}
+        # Masks of writable registers
+        self.wmask = {}
+        # Addresses of registers, indexed by path
+        self.paths = {}
+        # Areas of blackboxes, indexed by path: (base, size)
+        self.blackboxes = {}
+        # Attached blackbox handlers: list of (base, size, handler)
+        self.hooks = []
+        # SET/CLR/TOGGLE aliases: address -> (register address, operation)
+        self.aliases = {}
+        # Current (not latched) values of registers in snapshot groups
+        # The first register of a group is stored only here,
+        # the mem contains the latched values of other registers
+        self.live = {}
+        # Snapshot groups: address of the first register -> addresses of the others
+        self.latches = {}
+        # Emulated memory areas, indexed by path
+        self.memories = {}
+        # FIFO ports: address -> (queue, is_writable, mask)
+        self.fifos = {}
+        self._add_block(desc, base, "")
+
+    def _add_block(self, desc, base, path):
+        for adr, name, reps, is_vector, is_writable, default, mask in desc.x__regs:
+            for i in range(reps):
+                self.mem[base + adr + i] = default
+                self.paths[_item_name(path, name, i, is_vector)] = base + adr + i
+                if is_writable:
+                    self.wmask[base + adr + i] = mask
+        for adr, name, reps, is_vector, is_writable, default, mask in desc.x__fifos:
+            for i in range(reps):
+                self.fifos[base + adr + i] = (deque(), is_writable, mask)
+                self.paths[_item_name(path, name, i, is_vector)] = base + adr + i
+        for group in desc.x__snapshots:
+            addrs = [base + adr + i for adr, reps in group for i in range(reps)]
+            self.live[addrs[0]] = self.mem.pop(addrs[0])
+            for adr in addrs[1:]:
+                self.live[adr] = self.mem[adr]
+            self.latches[addrs[0]] = addrs[1:]
+        for adr, name, reps, is_vector, bdesc in desc.x__subblocks:
+            for i in range(reps):
+                self._add_block(
+                    bdesc, base + adr + i * bdesc.x__size, _item_name(path, name, i, is_vector)
+                )
+        for adr, reps in desc.x__bitops:
+            for i in range(reps):
+                for k in (1, 2, 3):
+                    self.aliases[base + adr + k * reps + i] = (base + adr + i, k)
+        for adr, name, depth, width in desc.x__memories:
+            mem = Memory(depth, width)
+            self.memories[_item_name(path, name, 0, False)] = mem
+            self.hooks.append((base + adr, depth, mem))
+        for adr, name, reps, is_vector, size in desc.x__blackboxes:
+            for i in range(reps):
+                self.blackboxes[_item_name(path, name, i, is_vector)] = (
+                    base + adr + i * size,
+                    size,
+                )
+
+    def attach(self, path, handler):
+        """Attach the handler to the blackbox with the given path (e.g. "EXTERN[1]").
+
+        The handler gets the offset relative to the base of the blackbox.
+        """
+        base, size = self.blackboxes[path]
+        self.hooks.append((base, size, handler))
+
+    def _hook(self, address):
+        for base, size, handler in self.hooks:
+            if base <= address < base + size:
+                return handler, address - base
+        raise BusError("Access to unmapped address " + hex(address))
+
+    def fifo(self, path):
+        """Return the queue emulating the FIFO port with the given path.
+
+        The test code appends the data to the queue of the read FIFO,
+        and takes the data written to the write FIFO from its queue.
+        """
+        return self.fifos[self.paths[path]][0]
+
+    def __getitem__(self, path):
+        adr = self.paths[path]
+        if adr in self.live:
+            return self.live[adr]
+        return self.mem[adr]
+
+    def __setitem__(self, path, value):
+        adr = self.paths[path]
+        if adr in self.live:
+            self.live[adr] = value
+        else:
+            self.mem[adr] = value
+
+    def read(self, address):
+        try:
+            return self.mem[address]
+        except KeyError:
+            if address in self.aliases:
+                return self.mem[self.aliases[address][0]]
+            if address in self.latches:
+                for adr in self.latches[address]:
+                    self.mem[adr] = self.live[adr]
+                return self.live[address]
+            if address in self.fifos:
+                data, is_writable, mask = self.fifos[address]
+                if is_writable or not data:
+                    raise BusError("Read of the write or empty FIFO at " + hex(address))
+                return data.popleft()
+            handler, offset = self._hook(address)
+            return handler.read(offset)
+
+    def write(self, address, value):
+        try:
+            self.mem[address] = value & self.wmask[address]
+        except KeyError:
+            if address in self.mem or address in self.latches:
+                # Status register, the write is ignored like in the generated VHDL
+                return
+            if address in self.aliases:
+                self._bitop(address, value)
+                return
+            if address in self.fifos:
+                data, is_writable, mask = self.fifos[address]
+                if not is_writable:
+                    raise BusError("Write to the read FIFO at " + hex(address))
+                data.append(value & mask)
+                return
+            handler, offset = self._hook(address)
+            handler.write(offset, value)
+
+    def write_sel(self, address, value, sel):
+        mask = _sel_mask(sel)
+        if address in self.aliases:
+            # Like in the generated VHDL, the alias uses only the selected bytes
+            self._bitop(address, value & mask)
+            return
+        self.write(address, (self.read(address) & ~mask) | (value & mask))
+
+    def _bitop(self, address, value):
+        adr, op = self.aliases[address]
+        if op == 1:
+            val = self.mem[adr] | value
+        elif op == 2:
+            val = self.mem[adr] & ~value
+        else:
+            val = self.mem[adr] ^ value
+        self.mem[adr] = val & self.wmask[adr]
+
+    def read_block(self, address, count):
+        # Fast path for the emulated memory areas
+        for base, size, handler in self.hooks:
+            if isinstance(handler, Memory) and base <= address and address + count <= base + size:
+                return handler.data[address - base : address - base + count]
+        read = self.read
+        return _words([read(adr) for adr in range(address, address + count)])
+
+    def write_block(self, address, values):
+        write = self.write
+        for adr, val in enumerate(values, address):
+            write(adr, val)
+
+    def read_multi(self, addresses):
+        read = self.read
+        return _words([read(adr) for adr in addresses])
+
+    def write_multi(self, addresses, values):
+        write = self.write
+        for adr, val in zip(addresses, values):
+            write(adr, val)
@@ -0,0 +1,408 @@
+#!/usr/bin/python3
+"""@package docstring
+Documentation for ipbus.py module
+
+The ipbus.py module provides the native IPbus 2.0 client, that may be used
+as the interface for the agwb objects (IPbusIface), and the local UDP server
+(IPbusServer) serving the IPbus requests with any agwb interface object
+(e.g. the register file emulator from emul.py).
+
+The client packs many transactions (reads, writes, block reads, RMW-bits)
+into a single UDP packet (up to the MTU), and keeps several packets in flight.
+The words are sent in the network (big-endian) byte order.
+"""
+import socket
+import sys
+import threading
+from array import array
+from . import agwb
+
+PROTOCOL_VERSION = 2
+
+# Packet types
+PKT_CONTROL = 0
+PKT_STATUS = 1
+
+# Transaction types
+T_READ = 0
+T_WRITE = 1
+T_NI_READ = 2
+T_NI_WRITE = 3
+T_RMW_BITS = 4
+T_RMW_SUM = 5
+
+# Info codes
+INFO_SUCCESS = 0x0
+INFO_BAD_HEADER = 0x1
+INFO_READ_ERROR = 0x4
+INFO_WRITE_ERROR = 0x5
+INFO_REQUEST = 0xF
+
+# Maximum number of words in a single transaction
+MAX_TRANS_WORDS = 255
+
+# Size of IP and UDP headers
+UDP_OVERHEAD = 28
+
+
+def packet_header(packet_id, packet_type=PKT_CONTROL):
+    return (PROTOCOL_VERSION << 28) | (packet_id << 8) | 0xF0 | packet_type
+
+
+def transaction_header(tid, nwords, ttype, info=INFO_REQUEST):
+    return (PROTOCOL_VERSION << 28) | ((tid & 0xFFF) << 16) | (nwords << 8) | (ttype << 4) | info
+
+
+def encode_words(words):
+    """Convert the sequence of words into bytes in the network byte order."""
+    buf = array("I", words)
+    if sys.byteorder == "little":
+        buf.byteswap()
+    return buf.tobytes()
+
+
+def decode_words(data):
+    """Convert bytes in the network byte order into the array of words."""
+    buf = array("I", data[: len(data) & ~3])
+    if sys.byteorder == "little":
+        buf.byteswap()
+    return buf
+
+
+class Transaction(object):
+    """Single IPbus transaction.
+
+    For read transactions, nwords is the number of words to read.
+    For write transactions, payload contains the words to write.
+    For RMW transactions, payload contains the AND and OR terms (or the addend).
+    After execution, data contains the words returned by the target.
+    """
+
+    def __init__(self, ttype, address, nwords=1, payload=()):
+        self.ttype = ttype
+        self.address = address
+        self.nwords = nwords
+        self.payload = payload
+        self.data = None
+
+    def request_len(self):
+        return 2 + len(self.payload)
+
+    def response_len(self):
+        if self.ttype in (T_READ, T_NI_READ):
+            return 1 + self.nwords
+        if self.ttype in (T_RMW_BITS, T_RMW_SUM):
+            return 2
+        return 1
+
+    def encode(self, tid):
+        res = [transaction_header(tid, self.nwords, self.ttype), self.address]
+        res.extend(self.payload)
+        return res
+
+
+class IPbusIface(object):
+    """IPbus 2.0 client implementing the agwb interface.
+
+    host and port describe the target, mtu is the maximum size of IP packet,
+    max_in_flight is the maximum number of packets sent before waiting
+    for the response (it is limited by the number of buffers in the target).
+    """
+
+    def __init__(self, host, port=50001, mtu=1500, max_in_flight=8, timeout=1.0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect((host, port))
+        self.sock.settimeout(timeout)
+        self.max_words = (mtu - UDP_OVERHEAD) // 4
+        self.max_in_flight = max_in_flight
+        self._sync()
+
+    def close(self):
+        self.sock.close()
+
+    def _sync(self):
+        """Read the status of the target, to get the next expected packet ID."""
+        self.sock.send(encode_words([packet_header(0, PKT_STATUS)] + 15 * [0]))
+        words = decode_words(self.sock.recv(65536))
+        if len(words) < 4 or words[0] & 0xF != PKT_STATUS:
+            raise Exception("Wrong response to the IPbus status request")
+        self.max_words = min(self.max_words, words[1] // 4)
+        self.max_in_flight = max(1, min(self.max_in_flight, words[2]))
+        self.packet_id = (words[3] >> 8) & 0xFFFF
+
+    def _next_id(self):
+        pid = self.packet_id
+        self.packet_id = pid % 0xFFFF + 1
+        return pid
+
+    def _pack(self, trans):
+        """Split the list of transactions into packets fitting in the MTU."""
+        packets = []
+        cur = []
+        req_len = resp_len = 1
+        for tr in trans:
+            if cur and (
+                req_len + tr.request_len() > self.max_words
+                or resp_len + tr.response_len() > self.max_words
+            ):
+                packets.append(cur)
+                cur = []
+                req_len = resp_len = 1
+            cur.append(tr)
+            req_len += tr.request_len()
+            resp_len += tr.response_len()
+        if cur:
+            packets.append(cur)
+        return packets
+
+    def _decode(self, words, packet):
+        pos = 1
+        for tr in packet:
+            if pos >= len(words):
+                raise agwb.BusError("Truncated IPbus response")
+            hdr = words[pos]
+            info = hdr & 0xF
+            if info != INFO_SUCCESS:
+                raise agwb.BusError(
+                    "IPbus transaction at " + hex(tr.address) + " failed with info code " + hex(info)
+                )
+            ndata = tr.response_len() - 1
+            tr.data = words[pos + 1 : pos + 1 + ndata]
+            pos += 1 + ndata
+
+    def execute(self, trans):
+        """Execute the list of transactions.
+
+        The transactions are packed into packets, and up to max_in_flight
+        packets are sent before the responses are received.
+        """
+        packets = self._pack(trans)
+        pending = {}
+        error = None
+        i = 0
+        while i < len(packets) or pending:
+            while i < len(packets) and len(pending) < self.max_in_flight:
+                pid = self._next_id()
+                words = [packet_header(pid)]
+                for tid, tr in enumerate(packets[i]):
+                    words.extend(tr.encode(tid))
+                self.sock.send(encode_words(words))
+                pending[pid] = packets[i]
+                i += 1
+            words = decode_words(self.sock.recv(65536))
+            packet = pending.pop((words[0] >> 8) & 0xFFFF, None)
+            if packet is None:
+                # Response to the packet from the previous, failed call
+                continue
+            try:
+                self._decode(words, packet)
+            except agwb.BusError as exc:
+                if error is None:
+                    error = exc
+        if error is not None:
+            raise error
+        return trans
+
+    def _split(self, ttype, address, count, incr=True):
+        """Create the read transactions for count words, split into allowed sizes."""
+        res = []
+        for first in range(0, count, MAX_TRANS_WORDS):
+            n = min(MAX_TRANS_WORDS, count - first)
+            res.append(Transaction(ttype, address + first if incr else address, n))
+        return res
+
+    def _split_write(self, ttype, address, values, incr=True):
+        res = []
+        for first in range(0, len(values), MAX_TRANS_WORDS):
+            part = values[first : first + MAX_TRANS_WORDS]
+            res.append(
+                Transaction(ttype, address + first if incr else address, len(part), part)
+            )
+        return res
+
+    def _collect(self, trans):
+        res = array("I")
+        for tr in self.execute(trans):
+            res.extend(tr.data)
+        return res
+
+    def read(self, address):
+        return self.execute([Transaction(T_READ, address)])[0].data[0]
+
+    def write(self, address, value):
+        self.execute([Transaction(T_WRITE, address, 1, (value,))])
+
+    def modify(self, address, mask, value):
+        """Atomic RMW-bits transaction."""
+        and_term = ~mask & 0xFFFFFFFF
+        or_term = value & mask
+        self.execute([Transaction(T_RMW_BITS, address, 1, (and_term, or_term))])
+
+    def write_sel(self, address, value, sel):
+        """Partial-word write, performed as the RMW-bits transaction."""
+        self.modify(address, agwb._sel_mask(sel), value)
+
+    def read_block(self, address, count):
+        return self._collect(self._split(T_READ, address, count))
+
+    def write_block(self, address, values):
+        self.execute(self._split_write(T_WRITE, address, list(values)))
+
+    def read_fifo(self, address, count):
+        return self._collect(self._split(T_NI_READ, address, count, False))
+
+    def write_fifo(self, address, values):
+        self.execute(self._split_write(T_NI_WRITE, address, list(values), False))
+
+    def read_multi(self, addresses):
+        return self._collect([Transaction(T_READ, adr) for adr in addresses])
+
+    def write_multi(self, addresses, values):
+        self.execute(
+            [Transaction(T_WRITE, adr, 1, (val,)) for adr, val in zip(addresses, values)]
+        )
+
+
+class IPbusServer(object):
+    """Local UDP server serving IPbus 2.0 requests with the agwb interface object iface.
+
+    It is intended for tests and benchmarks (e.g. with the register file emulator).
+    If port is 0, the free port is selected (available in the port field).
+    """
+
+    def __init__(self, iface, host="127.0.0.1", port=0, mtu=1500, nbuffers=16):
+        self.iface = iface
+        self.mtu = mtu
+        self.nbuffers = nbuffers
+        self.next_id = 1
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.port = self.sock.getsockname()[1]
+        self.thread = None
+
+    def start(self):
+        """Start serving requests in the background thread."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.sock.close()
+
+    def serve_forever(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except OSError:
+                # The socket was closed
+                return
+            resp = self.handle(decode_words(data))
+            if resp is not None:
+                self.sock.sendto(encode_words(resp), addr)
+
+    def handle(self, words):
+        """Handle the request packet, returning the words of the response packet."""
+        if not words or (words[0] >> 28) != PROTOCOL_VERSION:
+            return None
+        ptype = words[0] & 0xF
+        if ptype == PKT_STATUS:
+            res = [words[0], self.mtu, self.nbuffers, packet_header(self.next_id)]
+            return res + 12 * [0]
+        if ptype != PKT_CONTROL:
+            return None
+        pid = (words[0] >> 8) & 0xFFFF
+        if pid != 0:
+            self.next_id = pid % 0xFFFF + 1
+        res = [words[0]]
+        pos = 1
+        while pos + 1 < len(words):
+            hdr = words[pos]
+            adr = words[pos + 1]
+            tid = (hdr >> 16) & 0xFFF
+            nwords = (hdr >> 8) & 0xFF
+            ttype = (hdr >> 4) & 0xF
+            pos += 2
+            try:
+                if ttype == T_READ:
+                    data = list(agwb._read_block(self.iface, adr, nwords))
+                elif ttype == T_NI_READ:
+                    data = list(agwb._read_fifo(self.iface, adr, nwords))
+                elif ttype == T_WRITE:
+                    agwb._write_block(self.iface, adr, words[pos : pos + nwords])
+                    pos += nwords
+                    data = []
+                elif ttype == T_NI_WRITE:
+                    agwb._write_fifo(self.iface, adr, words[pos : pos + nwords])
+                    pos += nwords
+                    data = []
+                elif ttype == T_RMW_BITS:
+                    old = self.iface.read(adr)
+                    self.iface.write(adr, (old & words[pos]) | words[pos + 1])
+                    pos += 2
+                    data = [old]
+                elif ttype == T_RMW_SUM:
+                    old = self.iface.read(adr)
+                    self.iface.write(adr, (old + words[pos]) & 0xFFFFFFFF)
+                    pos += 1
+                    data = [old]
+                else:
+                    res.append(transaction_header(tid, 0, ttype, INFO_BAD_HEADER))
+                    break
+            except agwb.BusError:
+                info = INFO_READ_ERROR if ttype in (T_READ, T_NI_READ) else INFO_WRITE_ERROR
+                res.append(transaction_header(tid, 0, ttype, info))
+                break
+            res.append(transaction_header(tid, nwords, ttype, INFO_SUCCESS))
+            res.extend(data)
+        return res
+
+
+"""
+Below is the demo code and the benchmark, using the IPbus server
+with the register file emulator.
+"""
+if __name__ == "__main__":
+    import time
+    from . import emul
+
+    class c1_desc(emul.BlockDesc):
+        x__size = 8192
+        x__regs = (
+            (0x0, "ID", 1, False, False, 0x1234, 0xFFFFFFFF),
+            (0x1, "VER", 1, False, False, 0x5678, 0xFFFFFFFF),
+            (0x2, "CTRL", 1, False, True, 0, 0xFFFFFFFF),
+            (0x1000, "TABLE", 4096, True, True, 0, 0xFFFFFFFF),
+        )
+
+    class c1(agwb.Block):
+        x__size = 8192
+        x__id = 0x1234
+        x__ver = 0x5678
+        x__fields = {
+            "ID": (0x0, (agwb.StatusRegister,)),
+            "VER": (0x1, (agwb.StatusRegister,)),
+            "CTRL": (0x2, (agwb.ControlRegister, {"START": agwb.BitField(0, 0, False)})),
+            "TABLE": (0x1000, 4096, (agwb.ControlRegister,)),
+        }
+
+    server = IPbusServer(emul.Emulator(c1_desc)).start()
+    mif = IPbusIface("127.0.0.1", server.port)
+    a = c1(mif, 0)
+    a.verify_id_and_version()
+    a.CTRL.START.write(1)
+    print("CTRL:", a.CTRL.read())
+    a.TABLE.write_all(array("I", range(4096)))
+    n = 2000
+    t0 = time.time()
+    for i in range(n):
+        a.TABLE[i].read()
+    t1 = time.time()
+    res = a.TABLE.read_all()
+    t2 = time.time()
+    res2 = mif.read_multi(range(0x1000, 0x2000, 2))
+    t3 = time.time()
+    print("single reads: %.0f words/s" % (n / (t1 - t0)))
+    print("block read: %.0f words/s" % (len(res) / (t2 - t1)))
+    print("batched reads: %.0f words/s" % (len(res2) / (t3 - t2)))
+    mif.close()
+    server.stop()
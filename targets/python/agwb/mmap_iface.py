@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""@package docstring
+Documentation for mmap_iface.py module
+
+The mmap_iface.py module provides the interface for the register space
+mapped into the memory of the process (e.g. via the UIO device or /dev/mem
+in SoC systems, where the Wishbone bus is accessible from the CPU).
+
+Reads and writes are direct 32-bit (or 64-bit for the 64-bit data bus)
+loads and stores on the memoryview of the mapped area. Block reads return
+the memoryview slices of the mapped area (no data are copied, but
+the returned object reflects the current content of the registers - copy it
+if you need a stable value).
+
+Partial-word writes (write_sel) are performed with byte or halfword stores
+(the byte lanes are mapped to addresses as in the little-endian CPU).
+
+As the mapping may be created for any file, the interface may be tested
+with a plain file instead of the device.
+"""
+import mmap
+import os
+from array import array
+
+
+class MmapIface(object):
+    """Interface accessing the memory-mapped register space.
+
+    fname is the name of the mapped file or device (e.g. "/dev/uio0" or "/dev/mem"),
+    nwords is the number of bus words in the mapped area,
+    offset is the offset of the area in the file in bytes (must be a multiple
+    of the page size; for UIO it selects the map: N * mmap.PAGESIZE,
+    for /dev/mem it is the physical address of the area),
+    data_width is the width of the data bus (32 or 64 bits).
+    """
+
+    def __init__(self, fname, nwords, offset=0, data_width=32):
+        if data_width not in (32, 64):
+            raise Exception("Unsupported data width: " + str(data_width))
+        self.wbytes = data_width // 8
+        self.wfmt = "I" if data_width == 32 else "Q"
+        self.full_sel = (1 << self.wbytes) - 1
+        fd = os.open(fname, os.O_RDWR | os.O_SYNC)
+        try:
+            self.mm = mmap.mmap(
+                fd,
+                nwords * self.wbytes,
+                mmap.MAP_SHARED,
+                mmap.PROT_READ | mmap.PROT_WRITE,
+                offset=offset,
+            )
+        finally:
+            os.close(fd)
+        self.words = memoryview(self.mm).cast(self.wfmt)
+        self.halves = memoryview(self.mm).cast("H")
+        self.bytes = memoryview(self.mm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Unmap the register space.
+
+        All memoryviews returned by read_block must be released before.
+        """
+        self.words.release()
+        self.halves.release()
+        self.bytes.release()
+        self.mm.close()
+
+    def read(self, address):
+        return self.words[address]
+
+    def write(self, address, value):
+        self.words[address] = value
+
+    def write_sel(self, address, value, sel):
+        wbytes = self.wbytes
+        if sel == self.full_sel:
+            self.words[address] = value
+            return
+        # Try to use halfword stores, and fall back to byte stores
+        for i in range(0, wbytes, 2):
+            if sel & (3 << i) == 3 << i:
+                self.halves[(wbytes * address + i) // 2] = (value >> (8 * i)) & 0xFFFF
+            else:
+                for j in (i, i + 1):
+                    if sel & (1 << j):
+                        self.bytes[wbytes * address + j] = (value >> (8 * j)) & 0xFF
+
+    def read_block(self, address, count):
+        return self.words[address : address + count]
+
+    def write_block(self, address, values):
+        if not isinstance(values, (array, memoryview)) and not hasattr(
+            values, "__array_interface__"
+        ):
+            values = array(self.wfmt, values)
+        elif memoryview(values).format != self.wfmt:
+            # E.g. 32-bit words written to the 64-bit bus
+            values = array(self.wfmt, values)
+        self.words[address : address + len(values)] = values
+
+    def read_multi(self, addresses):
+        words = self.words
+        return array(self.wfmt, [words[adr] for adr in addresses])
+
+    def write_multi(self, addresses, values):
+        words = self.words
+        for adr, val in zip(addresses, values):
+            words[adr] = val
+
+
+"""
+Below is the demo code, using the plain file as the mapped register space.
+"""
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from . import agwb
+
+    NWORDS = 4096
+
+    class c1(agwb.Block):
+        x__size = NWORDS
+        x__fields = {
+            "CTRL": (0, (agwb.ControlRegister, {"START": agwb.BitField(0, 0, False)})),
+            "TABLE": (1024, 2048, (agwb.ControlRegister,)),
+        }
+
+    with tempfile.NamedTemporaryFile() as f:
+        f.truncate(NWORDS * 4)
+        with MmapIface(f.name, NWORDS) as mif:
+            a = c1(mif, 0)
+            a.CTRL.START.write(1)
+            a.TABLE.write_all(array("I", range(2048)))
+            res = a.TABLE.read_all()
+            print("CTRL:", a.CTRL.read(), "TABLE[5]:", res[5], "type:", type(res).__name__)
+            res.release()
+            n = 100000
+            t0 = time.time()
+            for i in range(n):
+                mif.write(1024 + (i & 1023), i)
+                mif.read(1024 + (i & 1023))
+            t1 = time.time()
+            print("%.0f single transactions/s" % (2 * n / (t1 - t0)))
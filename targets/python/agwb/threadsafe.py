@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+"""@package docstring
+Documentation for threadsafe.py module
+
+The threadsafe.py module provides the interface wrapper, that allows
+to share the agwb objects between many threads.
+
+The bitfield writes are read-modify-write sequences. The wrapper provides
+the modify method (used by agwb.py for bitfield writes), which performs
+the whole sequence while holding the lock associated with the register address.
+The locks are striped (the address selects one of nlocks locks), so accesses
+to different registers are usually not serialized.
+Plain writes also take the address lock, so they can't be lost
+in the middle of the read-modify-write sequence.
+
+The wrapper also maintains the pool of underlying interface objects
+(e.g. separate connections to the same board). Each transaction takes
+a free object from the pool, so up to len(ifaces) transactions
+may be executed concurrently.
+"""
+import queue
+import threading
+from . import agwb
+
+
+class ThreadSafeIface(object):
+    """Thread-safe wrapper around the pool of interface objects.
+
+    ifaces is the list of interface objects giving access to the same
+    register space.
+    """
+
+    def __init__(self, ifaces, nlocks=256):
+        self.pool = queue.Queue()
+        for iface in ifaces:
+            self.pool.put(iface)
+        self.locks = [threading.Lock() for i in range(nlocks)]
+
+    def _lock(self, address):
+        return self.locks[address % len(self.locks)]
+
+    def _locks(self, addresses):
+        """Return the locks for all addresses, in a deadlock-free order."""
+        nlocks = len(self.locks)
+        return [self.locks[i] for i in sorted({adr % nlocks for adr in addresses})]
+
+    def _call(self, fun, *args):
+        """Execute fun(iface, *args) with the interface taken from the pool."""
+        iface = self.pool.get()
+        try:
+            return fun(iface, *args)
+        finally:
+            self.pool.put(iface)
+
+    def read(self, address):
+        return self._call(lambda iface: iface.read(address))
+
+    def write(self, address, value):
+        with self._lock(address):
+            self._call(lambda iface: iface.write(address, value))
+
+    def modify(self, address, mask, value):
+        """Atomically replace the bits selected by mask with the bits of value."""
+
+        def rmw(iface):
+            rval = iface.read(address)
+            iface.write(address, (rval & ~mask) | (value & mask))
+
+        with self._lock(address):
+            self._call(rmw)
+
+    def write_sel(self, address, value, sel):
+        """Write the bytes selected by sel (emulated with modify if not supported)."""
+
+        def wsel(iface):
+            if hasattr(iface, "write_sel"):
+                iface.write_sel(address, value, sel)
+            else:
+                mask = agwb._sel_mask(sel)
+                rval = iface.read(address)
+                iface.write(address, (rval & ~mask) | (value & mask))
+
+        with self._lock(address):
+            self._call(wsel)
+
+    def read_block(self, address, count):
+        return self._call(agwb._read_block, address, count)
+
+    def write_block(self, address, values):
+        locks = self._locks(range(address, address + len(values)))
+        for lock in locks:
+            lock.acquire()
+        try:
+            self._call(agwb._write_block, address, values)
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def read_fifo(self, address, count):
+        with self._lock(address):
+            return self._call(agwb._read_fifo, address, count)
+
+    def write_fifo(self, address, values):
+        with self._lock(address):
+            self._call(agwb._write_fifo, address, values)
+
+    def read_multi(self, addresses):
+        return self._call(agwb._read_multi, addresses)
+
+    def write_multi(self, addresses, values):
+        locks = self._locks(addresses)
+        for lock in locks:
+            lock.acquire()
+        try:
+            self._call(agwb._write_multi, addresses, values)
+        finally:
+            for lock in locks:
+                lock.release()
+
+
+"""
+Below is the stress test, showing that no bitfield updates are lost
+when many threads modify the same registers, and how the throughput
+scales with the number of threads (and pooled connections).
+The mock interface emulates the bus latency with time.sleep.
+"""
+if __name__ == "__main__":
+    import time
+
+    LATENCY = 0.0005
+    NOPS = 200
+    NREGS = 8
+
+    class MockIface(object):
+        def __init__(self, rf):
+            self.rf = rf
+
+        def read(self, address):
+            time.sleep(LATENCY)
+            return self.rf[address]
+
+        def write(self, address, value):
+            time.sleep(LATENCY)
+            self.rf[address] = value
+
+    class c1(agwb.Block):
+        x__size = NREGS
+        x__fields = {
+            "CNT": (
+                0,
+                NREGS,
+                (
+                    agwb.ControlRegister,
+                    {"F" + str(i): agwb.BitField(i, i, False) for i in range(32)},
+                ),
+            )
+        }
+
+    def worker(blk, nthread, nthreads):
+        # Each thread toggles its own bits in all registers,
+        # threads start from different registers
+        for i in range(NOPS):
+            reg = blk.CNT[(i + nthread) % NREGS]
+            for bit in range(nthread, 32, nthreads):
+                getattr(reg, "F" + str(bit)).write((i // NREGS + 1) & 1)
+
+    for nthreads in (1, 2, 4, 8):
+        rf = NREGS * [0]
+        mif = ThreadSafeIface([MockIface(rf) for i in range(nthreads)])
+        blk = c1(mif, 0)
+        threads = [
+            threading.Thread(target=worker, args=(blk, n, nthreads))
+            for n in range(nthreads)
+        ]
+        t0 = time.time()
+        for thr in threads:
+            thr.start()
+        for thr in threads:
+            thr.join()
+        t1 = time.time()
+        # Each bit is written NOPS / NREGS times, alternating 1 and 0, starting with 1
+        expected = 0xFFFFFFFF if (NOPS // NREGS) & 1 else 0
+        lost = sum(bin(val ^ expected).count("1") for val in rf)
+        nwrites = NOPS * 32
+        print(
+            "%d threads: %.1f bitfield writes/s, lost updates: %d"
+            % (nthreads, nwrites / (t1 - t0), lost)
+        )
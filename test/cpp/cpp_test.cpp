@@ -0,0 +1,58 @@
+// Test of the C++ headers generated from cpp.xml (run by cpp_test.py).
+// The functions below are also compiled to the assembly, and cpp_test.py
+// checks the number of loads and stores in them.
+#include <cstdio>
+#include <sys/mman.h>
+#include "agwb_MAIN.hpp"
+
+static const std::uintptr_t BASE = 0x10000000;
+static const agwb::MAIN<BASE> board = {};
+
+extern "C" {
+void start_bitops() { board.LINKS<3>().CTRL().START() = 1; }
+void stop_bitops() { board.LINKS<3>().CTRL().START() = 0; }
+void mode_bitops(uint32_t v) { board.LINKS<3>().CTRL().MODE() = v; }
+void start_plain() { board.LINKS<3>().CFG().START() = 1; }
+}
+
+static int errors = 0;
+
+static void check(const char *what, uint32_t val, uint32_t expected) {
+  if (val != expected) {
+    std::printf("%s: 0x%x, expected 0x%x\n", what, val, expected);
+    errors++;
+  }
+}
+
+int main() {
+  // Map the memory at BASE, so the functions may be executed
+  if (mmap(reinterpret_cast<void *>(BASE), 0x1000, PROT_READ | PROT_WRITE,
+           MAP_PRIVATE | MAP_ANONYMOUS | MAP_FIXED, -1, 0) == MAP_FAILED) {
+    std::perror("mmap");
+    return 1;
+  }
+  volatile uint32_t *ctrl = reinterpret_cast<volatile uint32_t *>(decltype(board.LINKS<3>().CTRL())::ADDRESS);
+  volatile uint32_t *cfg = reinterpret_cast<volatile uint32_t *>(decltype(board.LINKS<3>().CFG())::ADDRESS);
+  // ctrl[1] is the SET alias, ctrl[2] is the CLR alias
+  ctrl[0] = 0xa5;
+  start_bitops();
+  check("CTRL after START=1", ctrl[0], 0xa5);
+  check("SET after START=1", ctrl[1], 0x1);
+  check("CLR after START=1", ctrl[2], 0x0);
+  ctrl[1] = 0;
+  stop_bitops();
+  check("SET after START=0", ctrl[1], 0x0);
+  check("CLR after START=0", ctrl[2], 0x1);
+  ctrl[2] = 0;
+  mode_bitops(5);
+  check("SET after MODE=5", ctrl[1], 5 << 1);
+  check("CLR after MODE=5", ctrl[2], 0xa << 1);
+  check("MODE read", board.LINKS<3>().CTRL().MODE(), 0x2);
+  cfg[0] = 0x10;
+  start_plain();
+  check("CFG after START=1", cfg[0], 0x11);
+  if (errors)
+    return 1;
+  std::printf("OK\n");
+  return 0;
+}
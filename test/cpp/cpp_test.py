@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+# Test of the C++ backend.
+# The headers are generated from cpp.xml into the temporary directory,
+# cpp_test.cpp is compiled and executed, and the loads and stores
+# in its assembly are counted (on x86-64 only).
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CXX = os.environ.get("CXX", "g++")
+GEN = tempfile.mkdtemp()
+subprocess.run(
+    [sys.executable, HERE + "/../../src/addr_gen_wb.py",
+     "--infile", HERE + "/cpp.xml", "--cpp", GEN],
+    check=True, cwd=HERE, stdout=subprocess.DEVNULL,
+)
+CFLAGS = ["-std=c++11", "-O2", "-Wall", "-Werror", "-I" + GEN]
+
+print("Compile and run the test program")
+subprocess.run([CXX] + CFLAGS + [HERE + "/cpp_test.cpp", "-o", GEN + "/cpp_test"], check=True)
+subprocess.run([GEN + "/cpp_test"], check=True)
+
+
+def accesses(asm, func):
+    """Return the numbers of loads and stores in the function func."""
+    body = asm.split("\n" + func + ":\n", 1)[1].split(".cfi_endproc", 1)[0]
+    loads = stores = 0
+    for line in body.splitlines():
+        line = line.strip()
+        if not line or line.startswith(".") or line.endswith(":"):
+            continue
+        mnem, _, args = line.partition("\t")
+        if mnem.startswith(("j", "call", "ret")):
+            continue
+        # Split the operands at commas outside of parentheses
+        ops = [op.strip() for op in re.split(r",(?![^(]*\))", args) if op.strip()]
+        for i, op in enumerate(ops):
+            if op.startswith(("$", "%")):
+                continue
+            if i < len(ops) - 1:
+                loads += 1
+            else:
+                stores += 1
+                if not mnem.startswith("mov"):
+                    # Read-modify-write instruction
+                    loads += 1
+    return loads, stores
+
+
+if platform.machine() != "x86_64":
+    print("Counting of loads and stores is supported only on x86-64, skipped")
+else:
+    print("Count loads and stores")
+    subprocess.run(
+        [CXX] + CFLAGS + ["-S", HERE + "/cpp_test.cpp", "-o", GEN + "/cpp_test.s"], check=True
+    )
+    with open(GEN + "/cpp_test.s") as f:
+        asm = f.read()
+    # Fields of the register with bitops aliases: a single store to the alias,
+    # or two stores (CLR and SET) for other values of multi-bit fields
+    assert accesses(asm, "start_bitops") == (0, 1)
+    assert accesses(asm, "stop_bitops") == (0, 1)
+    loads, stores = accesses(asm, "mode_bitops")
+    assert loads == 0 and stores <= 2
+    # Without aliases, the field is written with load, OR and store
+    assert accesses(asm, "start_plain") == (1, 1)
+print("OK")
@@ -32,3 +32,27 @@
   r> ( val address )
   wb!
 ;
+
+\ The field of the register with SET/CLR/TOGGLE aliases may be written
+\ without reading the register: the cleared bits are written to the CLR
+\ alias, and the set bits are written to the SET alias.
+\ Single-bit fields are updated with one write. Other values of multi-bit
+\ fields need two writes, and the field is zero between them.
+\ The stride is the distance between the register and its SET alias
+\ (the CLR alias is placed at the double distance).
+\ The generated words with ".A" suffix leave ( address mask shift stride )
+\ on the stack.
+
+: bfa! ( val address mask shift stride -- )
+  >r ( val address mask shift ) ( R: stride )
+  rot r@ + ( val mask shift set_adr ) ( R: stride )
+  dup r> + ( val mask shift set_adr clr_adr )
+  >r >r ( val mask shift ) ( R: clr_adr set_adr )
+  rot swap lshift ( mask bits ) ( R: clr_adr set_adr )
+  over and ( mask bits ) ( R: clr_adr set_adr )
+  swap over xor ( bits clrbits ) ( R: clr_adr set_adr )
+  r> swap ( bits set_adr clrbits ) ( R: clr_adr )
+  ?dup if r@ wb! then ( bits set_adr ) ( R: clr_adr )
+  r> drop ( bits set_adr )
+  over if wb! else 2drop then
+;
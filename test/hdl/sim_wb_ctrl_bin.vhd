@@ -0,0 +1,235 @@
+-- Code used to implement the emulated bus
+-- according to method publicly disclosed by W.M.Zabolotny in 2007
+-- Usenet alt.sources "Bus controller model for VHDL & Python cosimulation"
+--
+-- This version uses the binary framed protocol, carrying many commands
+-- in a single message (see python_raw/cbus_bin.py).
+-- All commands from the received message are executed back to back,
+-- and their responses are sent in a single response message.
+--
+-- Request message:
+--   4 bytes - number of commands N (below 2^31)
+--   N times:
+--     1 byte  - command: 'R' - read, 'W' - write, 'T' - delay in ns
+--     4 bytes - address
+--     4 bytes - data (ignored for read, delay for 'T' - only 31 LSBs are used)
+-- Response message:
+--   4 bytes - number of responses N
+--   N times:
+--     1 byte  - status: 0 - ACK, 1 - ERR
+--     4 bytes - read data (0 for write and delay)
+-- All numbers are sent with the most significant byte first.
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+library general_cores;
+use general_cores.wishbone_pkg.all;
+library work;
+
+entity sim_wb_ctrl_bin is
+
+  generic (
+    rdpipename : string := "rdpipe";
+    wrpipename : string := "wrpipe"
+    );
+
+  port (
+    wb_m_out  : out t_wishbone_master_out;
+    wb_m_in   : in  t_wishbone_master_in;
+    clk_sys_i : in  std_logic
+    );
+
+end sim_wb_ctrl_bin;
+
+architecture simul of sim_wb_ctrl_bin is
+
+  constant addrwidth, datawidth : integer := 32;
+
+  type t_byte_file is file of character;
+
+begin  -- simul
+
+  process
+
+    file write_pipe          : t_byte_file;
+    file read_pipe           : t_byte_file;
+    variable sync_with_slope : boolean := false;
+    variable status          : boolean := false;
+
+    procedure read_byte (
+      variable res : out std_logic_vector(7 downto 0)) is
+      variable c : character;
+    begin
+      read(write_pipe, c);
+      res := std_logic_vector(to_unsigned(character'pos(c), 8));
+    end read_byte;
+
+    procedure read_word (
+      variable res : out std_logic_vector(31 downto 0)) is
+      variable tmp : std_logic_vector(31 downto 0);
+      variable b   : std_logic_vector(7 downto 0);
+    begin
+      for i in 3 downto 0 loop
+        read_byte(b);
+        tmp(i*8+7 downto i*8) := b;
+      end loop;
+      res := tmp;
+    end read_word;
+
+    procedure write_byte (
+      constant b : in std_logic_vector(7 downto 0)) is
+    begin
+      write(read_pipe, character'val(to_integer(unsigned(b))));
+    end write_byte;
+
+    procedure write_word (
+      constant w : in std_logic_vector(31 downto 0)) is
+    begin
+      for i in 3 downto 0 loop
+        write_byte(w(i*8+7 downto i*8));
+      end loop;
+    end write_word;
+
+    procedure bus_read (
+      variable address : in  std_logic_vector((addrwidth-1) downto 0);
+      variable data    : out std_logic_vector((datawidth-1) downto 0);
+      variable status  : out boolean
+      ) is
+    begin
+      if sync_with_slope = false then
+        wait until rising_edge(clk_sys_i);
+        sync_with_slope := true;
+      end if;
+      wb_m_out.adr <= address;
+      wb_m_out.we  <= '0';
+      wb_m_out.stb <= '1';
+      wb_m_out.cyc <= '1';
+      wb_m_out.sel <= (others => '1');
+      lr1 : loop
+        wait until rising_edge(clk_sys_i);
+        if wb_m_in.ack = '1' then
+          data   := wb_m_in.dat;
+          status := true;
+          exit lr1;
+        end if;
+        if wb_m_in.err = '1' then
+          data   := (others => '0');
+          status := false;
+          exit lr1;
+        end if;
+      end loop;
+      wb_m_out.stb <= '0';
+      wb_m_out.cyc <= '0';
+      lr2 : loop
+        wait until rising_edge(clk_sys_i);
+        if (wb_m_in.ack = '0') and
+          (wb_m_in.err = '0')and
+          (wb_m_in.rty = '0')
+        then
+          exit lr2;
+        end if;
+      end loop;
+    end bus_read;
+
+    procedure bus_write (
+      variable address : in  std_logic_vector((addrwidth-1) downto 0);
+      variable data    : in  std_logic_vector((datawidth-1) downto 0);
+      variable status  : out boolean
+      ) is
+    begin
+      if sync_with_slope = false then
+        wait until rising_edge(clk_sys_i);
+        sync_with_slope := true;
+      end if;
+      wb_m_out.adr <= address;
+      wb_m_out.dat <= data;
+      wb_m_out.we  <= '1';
+      wb_m_out.stb <= '1';
+      wb_m_out.cyc <= '1';
+      wb_m_out.sel <= (others => '1');
+      lw1 : loop
+        wait until rising_edge(clk_sys_i);
+        if wb_m_in.ack = '1' then
+          status := true;
+          exit lw1;
+        end if;
+        if wb_m_in.err = '1' then
+          status := false;
+          exit lw1;
+        end if;
+      end loop;
+      wb_m_out.stb <= '0';
+      wb_m_out.cyc <= '0';
+      wb_m_out.we  <= '0';
+      lw2 : loop
+        wait until rising_edge(clk_sys_i);
+        if (wb_m_in.ack = '0') and
+          (wb_m_in.err = '0')and
+          (wb_m_in.rty = '0')
+        then
+          exit lw2;
+        end if;
+      end loop;
+    end bus_write;
+
+    variable ncmds   : integer;
+    variable code    : std_logic_vector(7 downto 0);
+    variable data    : std_logic_vector(31 downto 0);
+    variable address : std_logic_vector(31 downto 0);
+    variable count   : std_logic_vector(31 downto 0);
+
+  begin  -- process
+    file_open(write_pipe, wrpipename, read_mode);
+    file_open(read_pipe, rdpipename, write_mode);
+    wb_m_out.dat <= (others => '0');
+    wb_m_out.adr <= (others => '0');
+    wb_m_out.sel <= (others => '0');
+    wb_m_out.cyc <= '0';
+    wb_m_out.stb <= '0';
+    wb_m_out.we  <= '0';
+
+    while not endfile(write_pipe) loop
+      -- Read the header of the request message
+      read_word(count);
+      -- The number must fit in the integer (cbus_bin.py sends at most MAX_CMDS)
+      assert count(31) = '0'
+        report "Error: too many commands in the request message" severity failure;
+      ncmds := to_integer(unsigned(count(30 downto 0)));
+      -- The number of responses is known in advance
+      write_word(count);
+      -- Execute all commands back to back
+      for i in 0 to ncmds-1 loop
+        read_byte(code);
+        read_word(address);
+        read_word(data);
+        case to_integer(unsigned(code)) is
+          when character'pos('W') =>
+            bus_write(address, data, status);
+            data := (others => '0');
+          when character'pos('R') =>
+            bus_read(address, data, status);
+          when character'pos('T') =>
+            -- Use only 31 bits, so that the delay fits in the integer
+            wait for to_integer(unsigned(data(30 downto 0))) * 1 ns;
+            sync_with_slope := false;
+            data            := (others => '0');
+            status          := true;
+          when others =>
+            assert(false)
+              report "Error: wrong command code in the request message" severity error;
+            data   := (others => '0');
+            status := false;
+        end case;
+        if status then
+          write_byte(x"00");
+        else
+          write_byte(x"01");
+        end if;
+        write_word(data);
+      end loop;
+    end loop;
+    wait;
+  end process;
+
+end simul;
@@ -13,8 +13,10 @@ library work;
 entity wb_test_top is
 
   generic (
-    rdpipename : string := "rdpipe";
-    wrpipename : string := "wrpipe"
+    rdpipename   : string  := "rdpipe";
+    wrpipename   : string  := "wrpipe";
+    -- Use the binary batched protocol (python_raw/cbus_bin.py)
+    bin_protocol : boolean := false
     );
 
   port (
@@ -38,14 +40,27 @@ begin  -- simul
 
   rst_n_i <= not rst_i;
 
-  sim_wb_ctrl_1 : entity work.sim_wb_ctrl
-    generic map (
-      rdpipename => rdpipename,
-      wrpipename => wrpipename)
-    port map (
-      wb_m_out  => wb_m_out,
-      wb_m_in   => wb_m_in,
-      clk_sys_i => clk_sys_i);
+  gen_text : if not bin_protocol generate
+    sim_wb_ctrl_1 : entity work.sim_wb_ctrl
+      generic map (
+        rdpipename => rdpipename,
+        wrpipename => wrpipename)
+      port map (
+        wb_m_out  => wb_m_out,
+        wb_m_in   => wb_m_in,
+        clk_sys_i => clk_sys_i);
+  end generate gen_text;
+
+  gen_bin : if bin_protocol generate
+    sim_wb_ctrl_1 : entity work.sim_wb_ctrl_bin
+      generic map (
+        rdpipename => rdpipename,
+        wrpipename => wrpipename)
+      port map (
+        wb_m_out  => wb_m_out,
+        wb_m_in   => wb_m_in,
+        clk_sys_i => clk_sys_i);
+  end generate gen_bin;
 
   main_1 : entity work.main
     port map (
@@ -26,6 +26,11 @@ use ieee.std_logic_1164.all;
 
 entity wb_test_top_tb is
 
+  generic (
+    -- Use the binary batched protocol (python_raw/cbus_bin.py)
+    bin_protocol : boolean := false
+    );
+
 end entity wb_test_top_tb;
  
 -------------------------------------------------------------------------------
@@ -50,8 +55,9 @@ begin  -- architecture test
   -- component instantiation
   DUT: entity work.wb_test_top
     generic map (
-      rdpipename => rdpipename,
-      wrpipename => wrpipename)
+      rdpipename   => rdpipename,
+      wrpipename   => wrpipename,
+      bin_protocol => bin_protocol)
     port map (
       rst_i     => rst_i,
       clk_io_i => clk_io_i,
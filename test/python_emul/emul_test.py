@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+# Test of the Python emulator of the register file.
+# The Python package is generated from bitops.xml into the temporary directory.
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GEN = tempfile.mkdtemp()
+subprocess.run(
+    [sys.executable, HERE + "/../../src/addr_gen_wb.py",
+     "--infile", HERE + "/bitops.xml", "--python", GEN],
+    check=True, cwd=HERE, stdout=subprocess.DEVNULL,
+)
+sys.path.insert(0, GEN)
+import agwb
+from agwb import emul
+from agwb.MAIN_emul import MAIN as MAIN_desc
+
+
+
+class NoSel(object):
+    """Interface without write_sel, logging the addresses of writes."""
+
+    def __init__(self, em):
+        self.em = em
+        self.writes = []
+
+    def read(self, address):
+        return self.em.read(address)
+
+    def write(self, address, value):
+        self.writes.append(address)
+        self.em.write(address, value)
+
+
+em = emul.Emulator(MAIN_desc)
+a = agwb.MAIN(em, 0)
+a.verify_id_and_version()
+
+print("Test the bitfields written via SET/CLR aliases")
+a.CTRL.MODE.write(5)
+assert a.CTRL.MODE.read() == 5
+a.CTRL.START.write(1)
+a.CTRL.LEVEL.write(-3)
+assert a.CTRL.START.read() == 1
+assert a.CTRL.MODE.read() == 5
+assert a.CTRL.LEVEL.read() == -3
+a.CTRL.MODE.write(0xa)
+assert a.CTRL.read() == (1 | (0xa << 1) | ((-3 & 0xff) << 5))
+a.CTRL.START.write(0)
+assert a.CTRL.MODE.read() == 0xa and a.CTRL.START.read() == 0
+print("Test the aliases of the vector of registers")
+a.MASKS[2].HI.write(0x5a)
+a.MASKS[2].LO.write(0x11)
+assert a.MASKS[2].read() == 0x5a11
+assert a.MASKS[1].read() == 0 and a.MASKS[3].read() == 0
+a.MASKS[2].HI.write(0)
+assert a.MASKS[2].read() == 0x11
+# FLAGS is not byte-aligned, so write_sel can't be used
+a.MASKS[1].FLAGS.write(5)
+a.MASKS[1].FLAGS.write(6)
+assert a.MASKS[1].read() == 6 << 16
+assert a.MASKS[0].read() == 0 and a.MASKS[2].read() == 0x11
+# Without write_sel, all fields are written via the aliases
+ns = NoSel(em)
+b = agwb.MAIN(ns, 0)
+base = b.MASKS[3].x__base
+step = len(b.MASKS)
+b.MASKS[3].HI.write(0x80)
+b.MASKS[3].FLAGS.write(3)
+b.MASKS[3].LO.write(0xff)
+b.MASKS[3].FLAGS.write(4)
+assert b.MASKS[3].read() == 0x480ff
+set_adr, clr_adr = base + step, base + 2 * step
+# LO is set with one write, other values need CLR and SET
+assert ns.writes == [clr_adr, set_adr, clr_adr, set_adr, set_adr, clr_adr, set_adr]
+print("Test the register without aliases")
+a.PLAIN.write(0x12345678)
+assert a.PLAIN.read() == 0x12345678
+print("OK")
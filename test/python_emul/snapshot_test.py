@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+# Test of the snapshot groups in the Python emulator of the register file.
+# The Python package is generated from snapshot.xml into the temporary directory.
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GEN = tempfile.mkdtemp()
+subprocess.run(
+    [sys.executable, HERE + "/../../src/addr_gen_wb.py",
+     "--infile", HERE + "/snapshot.xml", "--python", GEN],
+    check=True, cwd=HERE, stdout=subprocess.DEVNULL,
+)
+sys.path.insert(0, GEN)
+import agwb
+from agwb import emul
+from agwb.MAIN_emul import MAIN as MAIN_desc
+
+em = emul.Emulator(MAIN_desc)
+a = agwb.MAIN(em, 0)
+a.verify_id_and_version()
+
+
+def set_live(lo, hi, cnt):
+    em["TS_LO"] = lo
+    em["TS_HI"] = hi
+    for i, val in enumerate(cnt):
+        em["CNT[" + str(i) + "]"] = val
+
+
+print("Test the latch of the snapshot group")
+set_live(1, 2, [3, 4, 5])
+# Without reading TS_LO, the other registers return the old latched values
+assert a.TS_HI.read() == 0
+assert a.TS_LO.read() == 1
+assert a.TS_HI.read() == 2
+set_live(6, 7, [8, 9, 10])
+assert a.TS_HI.read() == 2 and a.CNT[1].read() == 4
+print("Test read_group")
+vals = a.read_group("TSTAMP")
+assert vals["TS_LO"] == 6 and vals["TS_HI"] == 7
+assert list(vals["CNT"]) == [8, 9, 10]
+# The values are latched, so the live values changed later are not seen
+set_live(11, 12, [13, 14, 15])
+assert a.TS_HI.read() == 7
+vals = a.read_group("TSTAMP")
+assert (vals["TS_LO"], vals["TS_HI"], list(vals["CNT"])) == (11, 12, [13, 14, 15])
+print("Test the register outside the group")
+em["FREE"] = 16
+assert a.FREE.read() == 16
+print("OK")
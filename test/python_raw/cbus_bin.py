@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Python side of the binary framed protocol used with hdl/sim_wb_ctrl_bin.vhd
+# Many commands are sent in a single message, and executed by the simulator
+# back to back. The format of messages is described in sim_wb_ctrl_bin.vhd
+import struct
+
+# Maximum number of commands in a single message
+# (keeps both messages well below the size of the pipe buffer)
+MAX_CMDS = 4096
+
+class BusError(Exception):
+    pass
+
+def bus_transact(cmds):
+    """ Execute the list of commands (code, address, data)
+    Returns the list of (status, data) tuples
+    """
+    res = []
+    for first in range(0, len(cmds), MAX_CMDS):
+        part = cmds[first:first+MAX_CMDS]
+        msg = [struct.pack(">I", len(part))]
+        for code, adr, val in part:
+            msg.append(struct.pack(">cII", code, adr, val))
+        wrpip.write(b"".join(msg))
+        wrpip.flush()
+        n = struct.unpack(">I", rdpip.read(4))[0]
+        if n != len(part):
+            raise Exception("Wrong number of responses: " + str(n))
+        resp = rdpip.read(5 * n)
+        res.extend(struct.iter_unpack(">BI", resp))
+    return res
+
+def bus_delay(time_ns):
+    # The simulator uses only 31 bits of the delay
+    if time_ns >= 1 << 31:
+        raise Exception("Delay too long: " + str(time_ns) + " ns")
+    bus_transact([(b"T", 0, time_ns)])
+
+print("Python controller ready. Start the simulation!\n")
+wrpip=open("/tmp/wrpipe","wb")
+rdpip=open("/tmp/rdpipe","rb")
+
+class cbus_iface(object):
+  """ Interface supporting the block and batched transfers.
+  If posted is True, writes are queued and sent together with the next read
+  (or with the explicit flush). In that case errors of writes are reported
+  by the next read or flush.
+  """
+  def __init__(self, posted=False):
+      self.posted = posted
+      self.queue = []
+
+  def _execute(self, cmds):
+      cmds = self.queue + cmds
+      self.queue = []
+      res = bus_transact(cmds)
+      for (code, adr, val), (status, data) in zip(cmds, res):
+          if status != 0:
+              raise BusError("Error status returned for " + code.decode() + " at " + hex(adr))
+      return [data for status, data in res]
+
+  def flush(self):
+      if self.queue:
+          self._execute([])
+
+  def write(self, address, value):
+      self.queue.append((b"W", address, value))
+      if not self.posted:
+          self.flush()
+
+  def read(self, address):
+      return self._execute([(b"R", address, 0)])[-1]
+
+  def read_block(self, address, count):
+      return self.read_multi(range(address, address + count))
+
+  def write_block(self, address, values):
+      self.write_multi(range(address, address + len(values)), values)
+
+  def read_multi(self, addresses):
+      cmds = [(b"R", adr, 0) for adr in addresses]
+      if not cmds:
+          return []
+      return self._execute(cmds)[-len(cmds):]
+
+  def write_multi(self, addresses, values):
+      self.queue.extend((b"W", adr, val) for adr, val in zip(addresses, values))
+      if not self.posted:
+          self.flush()
@@ -0,0 +1,19 @@
+#!/usr/bin/python3
+# Test using the binary batched protocol (requires sim_wb_ctrl_bin in the simulation)
+import cbus_bin as cbus
+import agwb
+cbus.bus_delay(100)
+mif=cbus.cbus_iface(posted=True)
+a=agwb.MAIN(mif,0)
+print("Verify ID and VER of the whole hierarchy")
+a.verify_id_and_version()
+print("LINKS STATUS read:"+str(list(a.LINKS[:].STATUS.read())))
+a.LINKS[:].CTRL.START.write(1)
+a.TEST_OUT.write_all([0x13,0x14,0x15])
+print("TEST_OUT read:"+str(list(a.TEST_OUT.read_all())))
+print("TEST_IN read:"+str(list(a.TEST_IN.read_all())))
+print("Now we test the blackbox")
+a.EXTERN[1].reg[2].write(0x76)
+print("EXTERN[1] REG2 read:"+hex(a.EXTERN[1].reg[2].read()))
+mif.flush()
+cbus.bus_delay(3000)
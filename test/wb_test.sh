@@ -17,4 +17,7 @@ mknod /tmp/wrpipe p
 #${TERMINAL} -e "python3 python_ipbus/wb_test.py; echo 'press ENTER'; read" &
 # Uncomment the line below to run the test that uses raw Python access
 ${TERMINAL} -e "python3 python_raw/wb_test.py; echo 'press ENTER'; read" &
+# Uncomment the line below to run the test that uses the binary batched protocol
+# (the simulation must be started with "make BIN_PROTOCOL=true" instead of "make")
+#${TERMINAL} -e "python3 python_raw/wb_test_bin.py; echo 'press ENTER'; read" &
 make
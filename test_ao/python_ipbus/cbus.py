@@ -17,7 +17,7 @@ def bus_read(adr):
     s=rdpip.readline()
     if s.strip()=="ERR":
        raise Exception("Error status returned")
-    return eval("0x"+s)
+    return int(s,16)
 
 def bus_delay(time_ns):
     cmd="T"+("%8.8x" % time_ns)+"\n"
@@ -27,10 +27,13 @@ print("Python controller ready. Start the simulation!\n")
 wrpip=open("/tmp/wrpipe","w")
 rdpip=open("/tmp/rdpipe","r")
 
+import functools
 import xml.etree.ElementTree as et
 class cbus_obj(object):
-  def __init__(self,adr,perm,mask):
+  def __init__(self,adr,perm,mask,bitfields=None):
     self.adr=adr
+    self.perm=perm
+    self.bitfields=bitfields
     self.can_read=False
     if perm.find("r")>=0:
        self.can_read=True
@@ -48,6 +51,11 @@ class cbus_obj(object):
           mask >>= 1
           shift+=1
        self.shift = shift
+  def child(self,name):
+      # Bitfields of the register
+      if not self.bitfields or name not in self.bitfields:
+         raise KeyError(name)
+      return cbus_obj(self.adr,self.perm,self.bitfields[name])
   def write(self,value):
       if not self.can_write:
          raise Exception("I can't write to this object")
@@ -74,40 +82,75 @@ class cbus_obj(object):
          val >>= self.shift
       return val
 
-def cbus_read_nodes(addr_directory,address_table_file,base_name="",base_addr=0,nodes={}):
+def cbus_file_name(addr_directory,address_table_file):
     #If address_table_file starts with "file://", remove it, and add addr_directory
     furl="file://"
     if address_table_file.find(furl)==0:
        address_table_file=addr_directory+"/"+address_table_file.replace(furl,"")
-    plik1=et.ElementTree(file=address_table_file)
-    print("Reading file: "+address_table_file)
+    return address_table_file
+
+@functools.lru_cache(maxsize=None)
+def cbus_parse_module(address_table_file):
+    """ Parse the address table file (only once for each file)
+    Returns the dictionary of child nodes: id -> (offset, module, permission, mask, bitfields)
+    For nested modules, permission, mask and bitfields are None.
+    """
     #Take the root element
-    er=plik1.getroot()
+    er=et.ElementTree(file=address_table_file).getroot()
     #It should be "node"
     if er.tag != "node":
         raise Exception("Wrong type of the root element!")
+    items={}
     #Scan child nodes
     for el in er.findall("node"):
-        print(el.tag)
-        print(el.attrib)
-        if base_name != "":
-            name = base_name+"."
-        else:
-            name = ""
-        name += el.attrib['id']
-        adr = base_addr+int(el.attrib['address'],16)
+        adr = int(el.attrib['address'],16)
         if 'module' in el.attrib:
             #This is a nested module
-            cbus_read_nodes(addr_directory,el.get('module'),name,adr,nodes)
+            items[el.attrib['id']]=(adr,el.get('module'),None,None,None)
         else:
-          # This is a register
-          perm = el.attrib['permission']
-          mask = int(el.get('mask','0x0'),16)
-          # Now we need to check if there are bitfields inside...
-          for bf in el.findall("node"):
-             mask = int(bf.get('mask','0x0'),16)
-             bfname=name+"."+bf.get('id')
-             nodes[bfname]=cbus_obj(adr,perm,mask)
-          nodes[name]=cbus_obj(adr,perm,mask)
-    return nodes
+            # This is a register, check if there are bitfields inside...
+            bitfields={}
+            for bf in el.findall("node"):
+                bitfields[bf.get('id')]=int(bf.get('mask','0x0'),16)
+            items[el.attrib['id']]=(adr,None,el.attrib['permission'],
+                                    int(el.get('mask','0x0'),16),bitfields)
+    return items
+
+class cbus_node(object):
+  """ Node of the address table hierarchy, built lazily
+  The child nodes are created when they are accessed for the first time.
+  Nodes may be accessed by the full path: node['LINKS[0].CTRL.START']
+  """
+  def __init__(self,addr_directory,address_table_file,base_addr=0):
+      self.addr_directory=addr_directory
+      self.base_addr=base_addr
+      self.items=cbus_parse_module(cbus_file_name(addr_directory,address_table_file))
+      self.children={}
+  def child(self,name):
+      node=self.children.get(name)
+      if node is None:
+         adr,module,perm,mask,bitfields=self.items[name]
+         adr += self.base_addr
+         if module is not None:
+            node=cbus_node(self.addr_directory,module,adr)
+         else:
+            node=cbus_obj(adr,perm,mask,bitfields)
+         self.children[name]=node
+      return node
+  def __getitem__(self,path):
+      node=self
+      for name in path.split("."):
+         node=node.child(name)
+      return node
+  def __contains__(self,path):
+      try:
+         self[path]
+      except KeyError:
+         return False
+      return True
 
+def cbus_read_nodes(addr_directory,address_table_file,base_addr=0):
+    """ Returns the root node of the address table
+    (the nodes are accessed by their paths: nodes['LINKS[0].ID'])
+    """
+    return cbus_node(addr_directory,address_table_file,base_addr)
@@ -17,7 +17,7 @@ def bus_read(adr):
     s=rdpip.readline()
     if s.strip()=="ERR":
        raise Exception("Error status returned")
-    return eval("0x"+s)
+    return int(s,16)
 
 def bus_delay(time_ns):
     cmd="T"+("%8.8x" % time_ns)+"\n"